@@ -1,13 +1,17 @@
 from models import db, Job
 from flask import Flask
+from search import ensure_search_index
+import versions
 
 app = Flask(__name__)
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///jobs.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 db.init_app(app)
+versions.init_app(app)
 
 with app.app_context():
+    ensure_search_index()
 
     new_jobs = [
         Job(title='Cloud Architect', description='Design and implement cloud infrastructure solutions', location='Denver, CO', salary=165000, job_type='full-time', employer_id=1),
@@ -19,6 +23,7 @@ with app.app_context():
     
     db.session.add_all(new_jobs)
     db.session.commit()
+    versions.bump('jobs')
     
     print(f"Now have {Job.query.count()} total jobs")
     print("All jobs available:")
\ No newline at end of file
@@ -1,13 +1,17 @@
 from models import db, Job, User
 from flask import Flask
+from search import ensure_search_index
+import versions
 
 app = Flask(__name__)
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///jobs.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 db.init_app(app)
+versions.init_app(app)
 
 with app.app_context():
+    ensure_search_index()
 
     new_jobs = [
         Job(title='Senior Software Engineer', description='Build scalable cloud applications using React and Node.js', location='Seattle, WA', salary=150000, job_type='full-time', employer_id=1),
@@ -24,6 +28,7 @@ with app.app_context():
     
     db.session.add_all(new_jobs)
     db.session.commit()
+    versions.bump('jobs')
     
     print("Added 10 new jobs successfully!")
     print("Jobs now available:")
@@ -1,28 +1,145 @@
-from flask import Flask
-from flask_cors import CORS
 import os
+import time
+
+from flask import Flask
+
+
+def create_app(config=None):
+    """Build the WorkBridge app.
+
+    Nothing here runs at import time: blueprints, extensions and the database
+    engine are set up on the first call, and bcrypt and the SQLAlchemy dialect
+    helpers are only imported when a request first needs them. How long each
+    step took is kept in app.extensions['startup_report'].
+    """
+    report = {}
+    started = last = time.perf_counter()
+
+    def step(name):
+        nonlocal last
+        now = time.perf_counter()
+        report[name] = round((now - last) * 1000, 2)
+        last = now
+
+    from dotenv import load_dotenv
+    from config import get_config
+    load_dotenv()
+    app = Flask(__name__)
+    app.config.from_object(config or get_config())
+    step('config_ms')
+
+    _init_extensions(app)
+    step('extensions_ms')
+
+    import cache
+    import events
+    import instrumentation
+    import versions
+    from database import init_db
+    init_db(app)
+    versions.init_app(app)
+    cache.init_app(app)
+    events.init_app(app)
+    instrumentation.init_app(app)
+    step('database_ms')
+
+    from routes import jobs_bp, auth_bp, applications_bp
+    app.register_blueprint(jobs_bp)
+    app.register_blueprint(auth_bp, url_prefix='/auth')
+    app.register_blueprint(applications_bp, url_prefix='/api')
+    step('blueprints_ms')
+
+    import tasks
+    tasks.init_app(app)
+
+    from serializers import JSONProvider, InvalidFields
+    app.json = JSONProvider(app)
+
+    @app.errorhandler(InvalidFields)
+    def invalid_fields(e):
+        return {'error': f'Unknown field: {e}'}, 400
+
+    from passwords import PasswordServiceBusy
+
+    @app.errorhandler(PasswordServiceBusy)
+    def password_service_busy(e):
+        return {'error': 'Server busy, please retry'}, 503, {'Retry-After': str(e.retry_after)}
+
+    @app.route('/')
+    def index():
+        return {'message': 'WorkBridge API is running'}
+
+    from ingest import ingest_jobs_command
+    from tasks import run_tasks_command
+    app.cli.add_command(ingest_jobs_command)
+    app.cli.add_command(run_tasks_command)
+
+    @app.cli.command('startup-report')
+    def startup_report():
+        for name, value in app.extensions['startup_report'].items():
+            print(f'{name}: {value}')
+
+    report['total_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    app.extensions['startup_report'] = report
+    app.logger.debug('startup: %s', report)
+    return app
+
+
+def _init_extensions(app):
+    from flask_cors import CORS
+    from flask_jwt_extended import JWTManager
+    from cors import PreflightMiddleware
+    CORS(app)
+    app.wsgi_app = PreflightMiddleware(
+        app.wsgi_app,
+        app.config['CORS_ORIGINS'],
+        app.config['CORS_METHODS'],
+        app.config['CORS_ALLOW_HEADERS'],
+        app.config['CORS_MAX_AGE'],
+        supports_credentials=app.config['CORS_SUPPORTS_CREDENTIALS'],
+    )
+    JWTManager(app)
+
+
+def create_events_app(config=None):
+    """Build an app that serves only /events, for gunicorn.events.conf.py.
+
+    It touches neither the database nor bcrypt: the user comes from the
+    token's user_id claim and events arrive through the shared broker, so
+    it can run on gevent with one greenlet per idle stream.
+    """
+    from dotenv import load_dotenv
+    from flask_jwt_extended import get_jwt, jwt_required
+    from config import get_config
+    import events
+    load_dotenv()
+    app = Flask(__name__)
+    app.config.from_object(config or get_config())
+    _init_extensions(app)
+    events.init_app(app)
 
-from flask_jwt_extended import JWTManager
-from models import db
-from routes import jobs_bp, auth_bp, applications_bp
+    @app.route('/events')
+    @jwt_required(locations=['headers', 'query_string'])
+    def event_stream():
+        user_id = get_jwt().get('user_id')
+        if user_id is None:
+            return {'error': 'Token lacks user_id; log in again'}, 401
+        return events.response(user_id)
 
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///jobs.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['JWT_SECRET_KEY'] = 'your-secret-key'
+    return app
 
-CORS(app, origins=['http://localhost:5173', 'http://localhost:3000'], supports_credentials=True, methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'], allow_headers=['Content-Type', 'Authorization', 'X-Requested-With'])
-jwt = JWTManager(app)
-db.init_app(app)
 
-app.register_blueprint(jobs_bp)
-app.register_blueprint(auth_bp, url_prefix='/auth')
-app.register_blueprint(applications_bp, url_prefix='/api')
+def __getattr__(name):
+    # `gunicorn app:app` and older imports still work; the app is only built
+    # the first time someone asks for it.
+    if name == 'app':
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(name)
 
-@app.route('/')
-def index():
-    return {'message': 'WorkBridge API is running'}
 
 if __name__ == '__main__':
+    app = create_app()
     port = int(os.environ.get("PORT", 5000))
-    app.run(host="0.0.0.0", port=port, debug=True)
+    app.run(host="0.0.0.0", port=port, debug=app.config['DEBUG'])
@@ -3,11 +3,10 @@ from flask_cors import CORS
 from dotenv import load_dotenv
 import os
 
-load_dotenv()
-
 from .extensions import db, migrate
 
 def create_app():
+    load_dotenv()
     app = Flask(__name__)
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URI')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
@@ -32,5 +31,10 @@ def create_app():
 
     return app
 
-# For seeding script
-app = create_app()
+# For seeding script; built on first access rather than at import
+def __getattr__(name):
+    if name == 'app':
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(name)
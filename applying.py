@@ -0,0 +1,185 @@
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import delete, select, tuple_
+
+from models import db, Application, ApplicationKey, Job, insert_ignore_statement
+
+# The one write path for job applications.
+#
+# (job_id, user_id) is unique in the database, so applications are inserted
+# ON CONFLICT DO NOTHING and RETURNING says which went in: a double click or
+# a retried request can never create a second row, however the requests
+# interleave. A client that sends an Idempotency-Key also gets the first
+# request's answer back on a retry, not "already applied"; the outcome is
+# stored in the same transaction as the application. Stored outcomes are
+# purged after KEY_TTL_SECONDS, with done background tasks.
+#
+# Concurrent submissions are group-committed. The request holding the
+# commit lock writes everything queued so far in one transaction; requests
+# that arrive meanwhile queue behind it and the next one to get the lock
+# writes them all. An idle server writes each request alone, with no wait.
+# If a shared transaction fails, each submission in it is written again on
+# its own, so one bad row only fails its own request.
+
+APPLIED = 'applied'
+ALREADY_APPLIED = 'already_applied'
+NOT_FOUND = 'not_found'
+MAX_BATCH = 500
+MAX_BULK = 50
+MAX_KEY_LENGTH = 200
+KEY_TTL_SECONDS = 24 * 3600
+
+
+class Submission:
+    __slots__ = ('job_id', 'user_id', 'key', 'outcome', 'replayed', 'error')
+
+    def __init__(self, job_id, user_id, key=None):
+        self.job_id = job_id
+        self.user_id = user_id
+        self.key = key
+        self.outcome = None
+        self.replayed = False
+        self.error = None
+
+    @property
+    def done(self):
+        return self.outcome is not None or self.error is not None
+
+
+class GroupCommit:
+    def __init__(self, max_batch=MAX_BATCH):
+        self.max_batch = max_batch
+        self.batches = 0
+        self.rows = 0
+        self._pending = []
+        self._lock = threading.Lock()
+        self._commit_lock = threading.Lock()
+
+    def submit(self, submissions):
+        with self._lock:
+            self._pending.extend(submissions)
+        while not all(submission.done for submission in submissions):
+            with self._commit_lock:
+                if all(submission.done for submission in submissions):
+                    break
+                with self._lock:
+                    batch = self._pending[:self.max_batch]
+                    del self._pending[:self.max_batch]
+                try:
+                    _write(batch)
+                except Exception as e:
+                    if len(batch) == 1:
+                        batch[0].error = e
+                    else:
+                        _write_each(batch)
+                self.batches += 1
+                self.rows += len(batch)
+        for submission in submissions:
+            if submission.error is not None:
+                raise submission.error
+        return submissions
+
+
+def _write_each(batch):
+    for submission in batch:
+        # Outcomes set before the shared transaction failed were rolled back.
+        submission.outcome, submission.replayed = None, False
+    for submission in batch:
+        if submission.done:
+            continue
+        try:
+            _write([submission])
+        except Exception as e:
+            submission.error = e
+
+
+def _stored_outcomes(conn, submissions):
+    keys = {(s.user_id, s.job_id, s.key) for s in submissions}
+    if not keys:
+        return {}
+    rows = conn.execute(
+        select(ApplicationKey.user_id, ApplicationKey.job_id, ApplicationKey.key, ApplicationKey.outcome)
+        .where(tuple_(ApplicationKey.user_id, ApplicationKey.job_id, ApplicationKey.key).in_(keys))
+    ).all()
+    return {(user_id, job_id, key): outcome for user_id, job_id, key, outcome in rows}
+
+
+def _write(batch):
+    dialect = db.engine.dialect.name
+    with db.engine.begin() as conn:
+        keyed = [s for s in batch if s.key]
+        stored = _stored_outcomes(conn, keyed)
+        existing = set(conn.scalars(select(Job.id).where(Job.id.in_({s.job_id for s in batch}))))
+
+        fresh = []
+        firsts = {}
+        for s in batch:
+            key = (s.user_id, s.job_id, s.key)
+            if s.key and key in stored:
+                s.outcome, s.replayed = stored[key], True
+            elif s.key and key in firsts:
+                # Same key twice in one batch: answered below, from the first.
+                continue
+            elif s.job_id not in existing:
+                s.outcome = NOT_FOUND
+            else:
+                fresh.append(s)
+            if s.key and key not in stored:
+                firsts.setdefault(key, s)
+
+        if fresh:
+            rows = list({(s.job_id, s.user_id): {'job_id': s.job_id, 'user_id': s.user_id, 'status': 'pending'}
+                         for s in fresh}.values())
+            inserted = set(conn.execute(
+                insert_ignore_statement(Application, dialect).values(rows)
+                .returning(Application.job_id, Application.user_id)
+            ).all())
+            for s in fresh:
+                pair = (s.job_id, s.user_id)
+                s.outcome = APPLIED if pair in inserted else ALREADY_APPLIED
+                inserted.discard(pair)
+
+        if firsts:
+            now = time.time()
+            recorded = set(conn.execute(
+                insert_ignore_statement(ApplicationKey, dialect).values([
+                    {'user_id': s.user_id, 'job_id': s.job_id, 'key': s.key, 'outcome': s.outcome, 'created_at': now}
+                    for s in firsts.values()
+                ]).returning(ApplicationKey.user_id, ApplicationKey.job_id, ApplicationKey.key)
+            ).all())
+            # Another process recorded the same key first; its answer wins.
+            raced = [s for key, s in firsts.items() if key not in recorded]
+            for key, outcome in _stored_outcomes(conn, raced).items():
+                firsts[key].outcome, firsts[key].replayed = outcome, True
+
+        for s in batch:
+            if s.outcome is None:
+                first = firsts[(s.user_id, s.job_id, s.key)]
+                s.outcome, s.replayed = first.outcome, True
+
+
+def purge_keys(ttl=KEY_TTL_SECONDS):
+    result = db.session.execute(delete(ApplicationKey).where(ApplicationKey.created_at < time.time() - ttl))
+    db.session.commit()
+    return result.rowcount
+
+
+def parse_key(value):
+    """Validate an Idempotency-Key header; None means the client sent none."""
+    if value is not None and not 0 < len(value) <= MAX_KEY_LENGTH:
+        raise ValueError('Invalid Idempotency-Key')
+    return value
+
+
+def get_buffer():
+    buffer = current_app.extensions.get('apply_buffer')
+    if buffer is None:
+        buffer = current_app.extensions.setdefault('apply_buffer', GroupCommit())
+    return buffer
+
+
+def apply(user_id, job_ids, key=None):
+    """Apply `user_id` to each of `job_ids`; returns a Submission with an outcome per job."""
+    return get_buffer().submit([Submission(job_id, user_id, key) for job_id in job_ids])
@@ -0,0 +1,85 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from urllib.parse import unquote, urlsplit
+
+from flask import current_app, request
+from werkzeug.exceptions import HTTPException, MethodNotAllowed
+from werkzeug.routing import RequestRedirect
+
+# Runs several GET sub-requests for one client round-trip, e.g. the four
+# calls the job-seeker dashboard makes on load. Each sub-request goes
+# through normal dispatch (auth, ETags, caches) with the caller's
+# Authorization header, in its own request context on a shared pool.
+#
+# The pool has room for every request thread in the worker to run a full
+# batch at once (gunicorn threads x MAX_REQUESTS; threads are only started
+# as needed), so concurrent dashboard loads never queue behind each other
+# and TIMEOUT_SECONDS only ever measures a slow endpoint, not a busy pool.
+
+MAX_REQUESTS = 10
+TIMEOUT_SECONDS = 10
+# Matched by endpoint, not path, so encoded or aliased paths cannot reach them.
+_EXCLUDED = ('jobs.run_batch', 'jobs.event_stream')
+
+REQUEST_THREADS = int(os.environ.get('GUNICORN_THREADS', 8))
+
+_pool = ThreadPoolExecutor(max_workers=REQUEST_THREADS * MAX_REQUESTS, thread_name_prefix='batch')
+
+
+class InvalidBatch(ValueError):
+    pass
+
+
+def parse(data):
+    """Accept {"requests": {"key": "/path?query", ...}} and return its items."""
+    requests = (data or {}).get('requests')
+    if not isinstance(requests, dict) or not requests:
+        raise InvalidBatch('requests must be a non-empty object of key: path')
+    if len(requests) > MAX_REQUESTS:
+        raise InvalidBatch(f'at most {MAX_REQUESTS} requests per batch')
+    for key, path in requests.items():
+        if not isinstance(path, str) or not path.startswith('/'):
+            raise InvalidBatch(f'{key}: path must start with /')
+        if _endpoint(path) in _EXCLUDED:
+            raise InvalidBatch(f'{key}: {path} cannot be batched')
+    return list(requests.items())
+
+
+def _endpoint(path, method='GET'):
+    """The endpoint `path` dispatches to, the way routing will see it, or None."""
+    adapter = current_app.url_map.bind('')
+    try:
+        endpoint, _ = adapter.match(unquote(path.split('?', 1)[0]), method=method)
+    except RequestRedirect as e:
+        return _endpoint(urlsplit(e.new_url).path, method)
+    except MethodNotAllowed as e:
+        return _endpoint(path, sorted(e.valid_methods)[0]) if e.valid_methods else None
+    except HTTPException:
+        return None
+    return endpoint
+
+
+def _dispatch(app, path, headers):
+    with app.test_request_context(path, method='GET', headers=headers):
+        response = app.full_dispatch_request()
+        body = response.get_json(silent=True)
+        if body is None and response.status_code != 304:
+            body = response.get_data(as_text=True)
+        return {'status': response.status_code, 'body': body}
+
+
+def run(items):
+    app = current_app._get_current_object()
+    headers = {name: value for name, value in request.headers.items()
+               if name.lower() in ('authorization', 'accept', 'accept-language')}
+    futures = {key: _pool.submit(_dispatch, app, path, headers) for key, path in items}
+    deadline = time.monotonic() + TIMEOUT_SECONDS
+    responses = {}
+    for key, future in futures.items():
+        try:
+            responses[key] = future.result(timeout=max(deadline - time.monotonic(), 0))
+        except TimeoutError:
+            future.cancel()
+            responses[key] = {'status': 504, 'body': {'error': 'Sub-request timed out'}}
+    return responses
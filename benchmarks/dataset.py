@@ -0,0 +1,173 @@
+"""Seeded synthetic dataset: users, jobs, applications and interviews at scale.
+
+    python -m benchmarks.dataset --scale 100k --database sqlite:///bench.db [--seed 42]
+
+Scale is the number of jobs. The other tables are sized against it: users
+are a tenth of the jobs, applications equal them, and interviews are a tenth
+of the applications. Employer ids are skewed so that a few employers own
+most of the listings, like real traffic, which makes employer 1 (the one
+the employer endpoints are hard-wired to) the heaviest. User 15, the
+hard-wired job seeker, is always a job seeker. Every account's password
+is 'demo123'.
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+
+import passwords  # noqa: E402
+import schema  # noqa: E402
+import versions  # noqa: E402
+from app import create_app  # noqa: E402
+from models import db, User, Job, Application, Interview  # noqa: E402
+
+SCALES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+CHUNK = 10_000
+
+TITLES = ('Software Engineer', 'Data Analyst', 'Product Manager', 'UX Designer', 'DevOps Engineer',
+          'Data Scientist', 'QA Engineer', 'Frontend Developer', 'Backend Developer', 'Nurse',
+          'Accountant', 'Sales Associate', 'Marketing Specialist', 'Customer Support Agent')
+LEVELS = ('Junior', '', 'Senior', 'Lead', 'Principal')
+LOCATIONS = ('Remote', 'New York, NY', 'San Francisco, CA', 'Austin, TX', 'Seattle, WA', 'Chicago, IL',
+             'Boston, MA', 'Denver, CO', 'Atlanta, GA', 'London, UK', 'Berlin, Germany', 'Toronto, Canada')
+JOB_TYPES = ('full-time', 'part-time', 'contract', 'internship')
+SKILLS = ('python', 'flask', 'react', 'sql', 'aws', 'docker', 'kubernetes', 'java', 'typescript',
+          'excel', 'figma', 'go', 'machine learning', 'project management', 'agile')
+STATUSES = ('pending', 'pending', 'pending', 'reviewed', 'accepted', 'rejected')
+
+
+def zipf(rng, n):
+    """A sampler of ids in 1..n where id k has weight 1/k."""
+    ids = range(1, n + 1)
+    cum_weights = list(itertools.accumulate(1 / k for k in ids))
+    return lambda: rng.choices(ids, cum_weights=cum_weights)[0]
+
+
+def _users(rng, count, employers, password_hash):
+    for user_id in range(1, count + 1):
+        role = 'employer' if user_id <= employers and user_id != 15 else 'job_seeker'
+        yield {
+            'id': user_id,
+            'username': f'user{user_id}@bench.test',
+            'password_hash': password_hash,
+            'role': role,
+            'name': f'User {user_id}',
+            'skills': ', '.join(rng.sample(SKILLS, 3)) if role == 'job_seeker' else None,
+            'location': rng.choice(LOCATIONS),
+        }
+
+
+def _jobs(rng, count, employers):
+    employer = zipf(rng, employers)
+    for job_id in range(1, count + 1):
+        title = f'{rng.choice(LEVELS)} {rng.choice(TITLES)}'.strip()
+        skills = rng.sample(SKILLS, 4)
+        yield {
+            'id': job_id,
+            'title': title,
+            'description': f'We are hiring a {title} to work with {", ".join(skills[:3])} and {skills[3]}. '
+                           f'Job {job_id} offers mentoring, flexible hours and a friendly team.',
+            'location': rng.choice(LOCATIONS),
+            'salary': round(rng.lognormvariate(11.2, 0.4), -3),
+            'job_type': rng.choices(JOB_TYPES, weights=(70, 10, 15, 5))[0],
+            'employer_id': employer(),
+        }
+
+
+def _applications(rng, count, jobs, users, employers):
+    seen = set()
+    application_id = 0
+    while application_id < count:
+        user_id = 15 if rng.random() < 0.001 else rng.randint(employers + 1, users)
+        job_id = rng.randint(1, jobs)
+        if (job_id, user_id) in seen:
+            continue
+        seen.add((job_id, user_id))
+        application_id += 1
+        yield {'id': application_id, 'job_id': job_id, 'user_id': user_id, 'status': rng.choice(STATUSES)}
+
+
+def _interviews(rng, count, applications):
+    for interview_id in range(1, count + 1):
+        yield {
+            'id': interview_id,
+            'application_id': rng.randint(1, applications),
+            'date': f'2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+            'time': f'{rng.randint(9, 17):02d}:00',
+            'location': rng.choice(('Zoom', 'Google Meet', 'On site')),
+            'notes': None,
+        }
+
+
+def insert_chunked(table, rows):
+    chunk = []
+    total = 0
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK:
+            db.session.execute(table.insert(), chunk)
+            db.session.commit()
+            total += len(chunk)
+            chunk.clear()
+    if chunk:
+        db.session.execute(table.insert(), chunk)
+        db.session.commit()
+        total += len(chunk)
+    return total
+
+
+def generate(jobs, seed=42):
+    """Fill the current app's (empty) database; returns row counts per table."""
+    rng = random.Random(seed)
+    users = max(jobs // 10, 100)
+    employers = max(users // 10, 20)
+    applications = jobs
+    interviews = applications // 10
+
+    db.create_all()
+    password_hash = passwords.hash_password('demo123')
+    counts = {
+        'user': insert_chunked(User.__table__, _users(rng, users, employers, password_hash)),
+        'job': insert_chunked(Job.__table__, _jobs(rng, jobs, employers)),
+        'application': insert_chunked(Application.__table__, _applications(rng, applications, jobs, users, employers)),
+        'interview': insert_chunked(Interview.__table__, _interviews(rng, interviews, applications)),
+    }
+    if db.engine.dialect.name == 'postgresql':
+        # Rows were inserted with explicit ids; move the sequences past them.
+        for table in ('user', 'job', 'application', 'interview'):
+            db.session.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), (SELECT MAX(id) FROM \"{table}\"))"))
+        db.session.commit()
+    # The full-text index and tags are built once, after the bulk load.
+    schema.upgrade()
+    for resource in versions.RESOURCES:
+        versions.bump(resource)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', default='10k', help=f"one of {', '.join(SCALES)} or a job count")
+    parser.add_argument('--database', required=True, help='SQLAlchemy URL of an empty database')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    jobs = SCALES.get(args.scale.lower()) or int(args.scale)
+
+    os.environ['DATABASE_URI'] = args.database
+    app = create_app()
+    with app.app_context():
+        started = time.perf_counter()
+        counts = generate(jobs, seed=args.seed)
+        print(f'Generated in {time.perf_counter() - started:.1f}s:')
+        for table, count in counts.items():
+            print(f'  {table:<12} {count:>10,}')
+
+
+if __name__ == '__main__':
+    main()
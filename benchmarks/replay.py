@@ -0,0 +1,217 @@
+"""Replay recorded traffic against the app and report latency per endpoint.
+
+    python -m benchmarks.replay --log server.log [--capture traffic.jsonl]
+        [--target inprocess | http://127.0.0.1:8000] [--database sqlite:///bench.db]
+        [--requests 5000] [--concurrency 8] [--save run.json] [--baseline run.json]
+
+The workload is every request in the given Werkzeug logs and JSONL captures,
+weighted by how often it appears (see benchmarks.workload). With the default
+in-process target the app is built here against --database. Anything else
+is a base URL, e.g. a local gunicorn started with gunicorn.conf.py. Pair it
+with a benchmarks.dataset database to get realistic row counts.
+
+Requests log in once as the seeker and the employer and reuse their tokens.
+Errors are transport failures and 5xx; 4xx are counted separately because
+the recorded traffic contains expected ones, such as re-applying to a job.
+With --baseline, the run fails (exit 1) when any endpoint's p95 is more than
+--tolerance slower than in the saved run.
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.workload import Workload, endpoint  # noqa: E402
+
+
+class InProcessClient:
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    def request(self, method, path, body=None, headers=None):
+        response = self._client.open(path, method=method, json=body, headers=headers)
+        return response.status_code, response.get_data()
+
+
+class HTTPClient:
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self._host, self._port = parts.hostname, parts.port or 80
+        self._connection = None
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        for attempt in (1, 2):
+            if self._connection is None:
+                self._connection = http.client.HTTPConnection(self._host, self._port, timeout=30)
+            try:
+                self._connection.request(method, path, body=payload, headers=headers)
+                response = self._connection.getresponse()
+                return response.status, response.read()
+            except (ConnectionError, http.client.HTTPException):
+                # A keep-alive connection the server closed; retry once on a new one.
+                self._connection.close()
+                self._connection = None
+                if attempt == 2:
+                    raise
+
+
+def login(client, email, password, role):
+    status, body = client.request('POST', '/auth/login', {'email': email, 'password': password, 'role': role})
+    if status != 200:
+        raise SystemExit(f'Login as {email} failed with {status}: {body[:200]!r}')
+    return json.loads(body)['access_token']
+
+
+def run(make_client, requests, concurrency, tokens):
+    """Send `requests` from `concurrency` threads; returns [(endpoint, status, seconds)]."""
+    results = []
+    cursor = itertools.count()
+    lock = threading.Lock()
+
+    def worker():
+        client = make_client()
+        local = []
+        while True:
+            i = next(cursor)
+            if i >= len(requests):
+                break
+            method, path, body, role = requests[i]
+            headers = {'Authorization': f'Bearer {tokens[role]}'} if role in tokens else {}
+            started = time.perf_counter()
+            try:
+                status, _ = client.request(method, path, body, headers)
+            except Exception:
+                status = 0
+            local.append((endpoint(method, path), status, time.perf_counter() - started))
+        with lock:
+            results.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+
+def summarize(results, elapsed):
+    groups = defaultdict(list)
+    for name, status, seconds in results:
+        groups[name].append((status, seconds))
+    groups['ALL'] = [(status, seconds) for _, status, seconds in results]
+    summary = {}
+    for name, samples in groups.items():
+        latencies = sorted(seconds for _, seconds in samples)
+        summary[name] = {
+            'requests': len(samples),
+            'throughput': len(samples) / elapsed,
+            'p50_ms': percentile(latencies, 50) * 1000,
+            'p95_ms': percentile(latencies, 95) * 1000,
+            'p99_ms': percentile(latencies, 99) * 1000,
+            'error_rate': sum(1 for status, _ in samples if status == 0 or status >= 500) / len(samples),
+            'client_errors': sum(1 for status, _ in samples if 400 <= status < 500),
+        }
+    return summary
+
+
+def report(summary):
+    print(f"{'endpoint':<42} {'n':>7} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err%':>6} {'4xx':>5}")
+    for name, row in sorted(summary.items(), key=lambda item: (item[0] == 'ALL', -item[1]['requests'])):
+        print(f"{name[:42]:<42} {row['requests']:>7} {row['throughput']:>8.1f} {row['p50_ms']:>8.2f} "
+              f"{row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['error_rate'] * 100:>6.2f} {row['client_errors']:>5}")
+
+
+def regressions(summary, baseline, tolerance, floor_ms=1.0):
+    """Endpoints whose p95 grew by more than `tolerance` (and at least floor_ms) since `baseline`."""
+    slower = []
+    for name, row in summary.items():
+        before = baseline.get(name)
+        if before and row['p95_ms'] > before['p95_ms'] * (1 + tolerance) and \
+                row['p95_ms'] - before['p95_ms'] > floor_ms:
+            slower.append((name, before['p95_ms'], row['p95_ms']))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--log', action='append', default=[], help='Werkzeug access log (repeatable)')
+    parser.add_argument('--capture', action='append', default=[], help='JSONL capture (repeatable)')
+    parser.add_argument('--include-options', action='store_true', help='also replay CORS preflights')
+    parser.add_argument('--target', default='inprocess')
+    parser.add_argument('--database', help='SQLAlchemy URL for the in-process app')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--warmup', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--seeker', default='user15@bench.test', help='job seeker login (password demo123)')
+    parser.add_argument('--employer', default='user1@bench.test', help='employer login (password demo123)')
+    parser.add_argument('--save', help='write the summary as JSON')
+    parser.add_argument('--baseline', help='summary JSON from an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    workload = Workload.from_files(args.log, args.capture, include_options=args.include_options)
+    if not len(workload):
+        parser.error('no requests found; pass --log and/or --capture')
+    print(f'Workload: {len(workload)} distinct requests, {workload.dropped} writes without bodies skipped')
+    for name, share in workload.describe()[:10]:
+        print(f'  {share * 100:5.1f}%  {name}')
+
+    if args.target == 'inprocess':
+        if args.database:
+            os.environ['DATABASE_URI'] = args.database
+        from app import create_app
+        app = create_app()
+        make_client = lambda: InProcessClient(app)  # noqa: E731
+    else:
+        make_client = lambda: HTTPClient(args.target)  # noqa: E731
+
+    client = make_client()
+    tokens = {
+        'job_seeker': login(client, args.seeker, 'demo123', 'job_seeker'),
+        'employer': login(client, args.employer, 'demo123', 'employer'),
+    }
+
+    if args.warmup:
+        run(make_client, workload.sample(args.warmup, seed=args.seed + 1), args.concurrency, tokens)
+    requests = workload.sample(args.requests, seed=args.seed)
+    started = time.perf_counter()
+    results = run(make_client, requests, args.concurrency, tokens)
+    elapsed = time.perf_counter() - started
+
+    summary = summarize(results, elapsed)
+    print(f'\n{len(results)} requests in {elapsed:.2f}s at concurrency {args.concurrency} ({args.target}):')
+    report(summary)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(summary, f, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as f:
+            slower = regressions(summary, json.load(f), args.tolerance)
+        for name, before, after in slower:
+            print(f'REGRESSION {name}: p95 {before:.2f}ms -> {after:.2f}ms')
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Serialization time per 1,000 jobs: hand-written ORM dicts + stdlib json vs serializers.py.
+
+    python -m benchmarks.serialization [--jobs 1000] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from config import get_config  # noqa: E402
+from models import db, Job  # noqa: E402
+from serializers import JOB, JOB_LIST_FIELDS  # noqa: E402
+
+
+def before():
+    jobs = Job.query.all()
+    payload = [{
+        'id': job.id,
+        'title': job.title,
+        'description': job.description,
+        'location': job.location,
+        'salary': job.salary,
+        'salary_range': f'${job.salary:,.0f}',
+        'job_type': job.job_type,
+        'employer_id': job.employer_id,
+        'employer_name': ['Microsoft', 'Google', 'Apple', 'Netflix', 'Meta'][(job.employer_id - 1) % 5],
+        'created_at': '2024-01-01T00:00:00'
+    } for job in jobs]
+    return json.dumps(payload, sort_keys=True)
+
+
+def after(app, fields):
+    columns, render = JOB.compile(fields)
+    rows = db.session.query(*columns).all()
+    return app.json.dumps([render(row) for row in rows])
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault('TEST_DATABASE_URI', 'sqlite://')
+    app = create_app(get_config('testing'))
+    with app.app_context():
+        db.create_all()
+        db.session.execute(Job.__table__.insert(), [{
+            'title': f'Software Engineer {i}',
+            'description': 'Build scalable web applications using React and Node.js. ' * 4,
+            'location': 'Seattle, WA',
+            'salary': 100000 + i,
+            'job_type': 'full-time',
+            'employer_id': i % 7 + 1,
+        } for i in range(args.jobs)])
+        db.session.commit()
+
+        scale = 1000 / args.jobs
+        results = [
+            ('before (ORM + stdlib json)', timed(before, args.repeat)),
+            ('after (columns + schema + JSON provider)', timed(lambda: after(app, JOB_LIST_FIELDS), args.repeat)),
+            ('after, ?fields=id,title,salary', timed(lambda: after(app, ['id', 'title', 'salary']), args.repeat)),
+        ]
+        print(f'{args.jobs} jobs, best of {args.repeat}, ms per 1,000 jobs:')
+        for name, seconds in results:
+            print(f'  {name:<45} {seconds * 1000 * scale:8.2f}')
+
+
+if __name__ == '__main__':
+    main()
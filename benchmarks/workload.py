@@ -0,0 +1,111 @@
+"""Turn recorded traffic into a weighted, replayable workload.
+
+Two sources are understood:
+
+* Werkzeug access logs such as server.log, one request per line:
+  127.0.0.1 - - [02/Nov/2025 22:56:47] "GET /jobs?limit=5 HTTP/1.1" 200 -
+* JSONL captures, one object per line:
+  {"method": "POST", "path": "/applications", "body": {"job_id": 3}, "role": "job_seeker", "weight": 2}
+  Only method and path are required. Lines without them are skipped.
+
+Access logs carry no request bodies, so writes are only kept when
+BODY_TEMPLATES knows how to fill one in.
+"""
+import json
+import random
+import re
+from collections import Counter, namedtuple
+
+Request = namedtuple('Request', 'method path body role')
+
+_ANSI = re.compile(r'\x1b\[[0-9;]*m')
+_WERKZEUG = re.compile(r'"(?P<method>[A-Z]+) (?P<path>\S+) HTTP/[\d.]+" (?P<status>\d{3})')
+_ID = re.compile(r'/\d+(?=/|$)')
+
+BODY_TEMPLATES = {
+    ('POST', '/auth/login'): lambda rng: {'email': 'demo@test.com', 'password': 'demo123'},
+    ('POST', '/api/login'): lambda rng: {'email': 'demo@test.com', 'password': 'demo123'},
+    ('POST', '/applications'): lambda rng: {'job_id': rng.randint(1, 1000)},
+    ('POST', '/api/'): lambda rng: {'job_id': rng.randint(1, 1000)},
+}
+
+
+def role_for(path):
+    return 'employer' if path.startswith(('/employer', '/jobs/bulk')) else 'job_seeker'
+
+
+def endpoint(method, path):
+    """Group requests for reporting: drop the query string and fold ids."""
+    return f"{method} {_ID.sub('/<id>', path.split('?', 1)[0])}"
+
+
+def parse_access_log(lines):
+    requests = Counter()
+    for line in lines:
+        match = _WERKZEUG.search(_ANSI.sub('', line))
+        if match:
+            requests[match['method'], match['path']] += 1
+    return requests
+
+
+def parse_capture(lines):
+    weighted = []
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(record, dict) or 'method' not in record or 'path' not in record:
+            continue
+        method = record['method'].upper()
+        request = Request(method, record['path'], record.get('body'), record.get('role') or role_for(record['path']))
+        weighted.append((request, float(record.get('weight', 1))))
+    return weighted
+
+
+class Workload:
+    def __init__(self, weighted):
+        self.requests = [request for request, _ in weighted]
+        self.weights = [weight for _, weight in weighted]
+        self.dropped = 0
+
+    @classmethod
+    def from_files(cls, logs=(), captures=(), include_options=False):
+        weighted = []
+        dropped = 0
+        for path in logs:
+            with open(path, encoding='utf-8', errors='replace') as f:
+                for (method, target), count in parse_access_log(f).items():
+                    if method == 'OPTIONS' and not include_options:
+                        continue
+                    body = None
+                    if method not in ('GET', 'HEAD', 'OPTIONS'):
+                        template = BODY_TEMPLATES.get((method, target.split('?', 1)[0]))
+                        if template is None:
+                            dropped += count
+                            continue
+                        body = template
+                    weighted.append((Request(method, target, body, role_for(target)), count))
+        for path in captures:
+            with open(path, encoding='utf-8') as f:
+                weighted.extend(parse_capture(f))
+        workload = cls(weighted)
+        workload.dropped = dropped
+        return workload
+
+    def __len__(self):
+        return len(self.requests)
+
+    def sample(self, count, seed=0):
+        """`count` requests drawn by weight, with any body templates filled in."""
+        rng = random.Random(seed)
+        drawn = rng.choices(self.requests, weights=self.weights, k=count)
+        return [request._replace(body=request.body(rng)) if callable(request.body) else request
+                for request in drawn]
+
+    def describe(self):
+        total = sum(self.weights)
+        shares = Counter()
+        for request, weight in zip(self.requests, self.weights):
+            shares[endpoint(request.method, request.path)] += weight
+        return [(name, weight / total) for name, weight in shares.most_common()]
@@ -0,0 +1,318 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import current_app, has_app_context, make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import versions
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU mapping whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class LocalBackend:
+    """In-process LRU bounded by the total size of the cached bodies."""
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        # Tag generations live outside the LRU so they are never evicted.
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                self._remove(key)
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, time.monotonic() + ttl)
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+
+    def counter(self, key):
+        return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def _remove(self, key):
+        value, _ = self._data.pop(key)
+        self.size -= len(value)
+
+
+class SharedMemoryBackend:
+    """Local stand-in for a shared cache such as Redis or memcached.
+
+    It speaks the same bytes-in/bytes-out interface as RedisBackend, with no
+    LRU of its own, so tests can run the shared code path without a server.
+    """
+
+    evictions = 0
+
+    def __init__(self):
+        self._data = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                return None
+            return entry[0]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (bytes(value), time.monotonic() + ttl)
+
+    def counter(self, key):
+        return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+
+class RedisBackend:
+    evictions = 0
+
+    def __init__(self, url, prefix='workbridge:'):
+        import redis
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key):
+        return self._client.get(self._prefix + key)
+
+    def set(self, key, value, ttl):
+        self._client.set(self._prefix + key, value, ex=max(int(ttl), 1))
+
+    def counter(self, key):
+        return int(self._client.get(self._prefix + key) or 0)
+
+    def incr(self, key):
+        return self._client.incr(self._prefix + key)
+
+
+class ResponseCache:
+    """Read-through cache for whole GET responses.
+
+    Entries are keyed on path plus sorted query args and carry tags (e.g.
+    'jobs' or 'job:12'). invalidate(tag) bumps the tag's generation, which is
+    part of every key using it, so stale entries are simply never read
+    again. Keys also carry the data version of each tag's resource, the one
+    the ETag is built from, so a write from another process (which cannot
+    bump this process's generations) still retires the cached body before
+    a new ETag can be paired with it. Concurrent misses for the same key are coalesced: one request
+    renders, the rest wait for its result.
+    """
+
+    def __init__(self, backend, ttl=30):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def key(self, path, args, tags):
+        query = urlencode(sorted(args.items(multi=True)))
+        generations = ','.join(f'{tag}={self.backend.counter(f"tag:{tag}")}' for tag in tags)
+        resources = sorted({_resource(tag) for tag in tags} - {None})
+        data = ','.join(f'{resource}={versions.get(resource)}' for resource in resources)
+        return f'response:{path}?{query}#{generations}#{versions.epoch()}:{data}'
+
+    def get_or_render(self, key, render):
+        """Return (body, content_type, status); render() is called on a miss."""
+        cached = self.backend.get(key)
+        if cached is not None:
+            self.hits += 1
+            return _unpack(cached)
+
+        with self._lock:
+            waiter = self._inflight.get(key)
+            if waiter is None:
+                self._inflight[key] = threading.Event()
+        if waiter is not None:
+            self.coalesced += 1
+            waiter.wait(timeout=10)
+            cached = self.backend.get(key)
+            if cached is not None:
+                self.hits += 1
+                return _unpack(cached)
+
+        self.misses += 1
+        try:
+            body, content_type, status = render()
+            if status == 200:
+                self.backend.set(key, _pack(body, content_type), self.ttl)
+            return body, content_type, status
+        finally:
+            if waiter is None:
+                with self._lock:
+                    self._inflight.pop(key).set()
+
+    def invalidate(self, *tags):
+        for tag in tags:
+            self.backend.incr(f'tag:{tag}')
+
+    def stats(self):
+        stats = {
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'evictions': self.backend.evictions,
+        }
+        if isinstance(self.backend, LocalBackend):
+            stats['entries'] = len(self.backend._data)
+            stats['bytes'] = self.backend.size
+        return stats
+
+
+def _resource(tag):
+    # 'jobs' and 'job:12' both depend on the jobs data version.
+    name = tag.split(':', 1)[0]
+    for resource in (name, name + 's'):
+        if resource in versions.RESOURCES:
+            return resource
+    return None
+
+
+def _pack(body, content_type):
+    return content_type.encode('utf-8') + b'\n' + body
+
+
+def _unpack(value):
+    content_type, _, body = value.partition(b'\n')
+    return body, content_type.decode('utf-8'), 200
+
+
+def init_app(app):
+    kind = app.config.get('RESPONSE_CACHE', 'local')
+    if kind == 'none':
+        return
+    if kind == 'redis':
+        backend = RedisBackend(app.config['RESPONSE_CACHE_URL'])
+    elif kind == 'shared-memory':
+        backend = SharedMemoryBackend()
+    else:
+        backend = LocalBackend(app.config.get('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    app.extensions['response_cache'] = ResponseCache(backend, ttl=app.config.get('RESPONSE_CACHE_TTL', 30))
+
+
+def response_cache():
+    return current_app.extensions.get('response_cache')
+
+
+def invalidate(*tags):
+    cache = response_cache()
+    if cache is not None:
+        cache.invalidate(*tags)
+
+
+def cached_response(*tags):
+    """Cache a public GET view. Tags may be callables taking the view's kwargs."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = response_cache()
+            if cache is None:
+                return view(*args, **kwargs)
+
+            def render():
+                response = make_response(view(*args, **kwargs))
+                return response.get_data(), response.content_type, response.status_code
+
+            resolved = [tag(**kwargs) if callable(tag) else tag for tag in tags]
+            key = cache.key(request.path, request.args, resolved)
+            body, content_type, status = cache.get_or_render(key, render)
+            return current_app.response_class(body, status=status, content_type=content_type)
+        return wrapper
+    return decorator
+
+
+# Job writes invalidate the list pages and the touched job's detail page
+# once the transaction commits, whichever code path made them.
+@event.listens_for(Session, 'after_flush')
+def _collect_job_writes(session, flush_context):
+    from models import Job
+    changed = session.info.setdefault('changed_jobs', set())
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(instance, Job):
+            changed.add(instance.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_job_writes(session):
+    changed = session.info.pop('changed_jobs', None)
+    if changed and has_app_context():
+        invalidate('jobs', *(f'job:{job_id}' for job_id in changed if job_id is not None))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_job_writes(session):
+    session.info.pop('changed_jobs', None)
@@ -0,0 +1,136 @@
+import os
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def _database_uri():
+    uri = os.environ.get('DATABASE_URI', 'sqlite:///jobs.db')
+    # Heroku-style URLs use the scheme SQLAlchemy dropped in 1.4.
+    if uri.startswith('postgres://'):
+        uri = 'postgresql://' + uri[len('postgres://'):]
+    return uri
+
+
+class Config:
+    DEBUG = False
+    TESTING = False
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Postgres pool
+    DB_POOL_SIZE = 5
+    DB_MAX_OVERFLOW = 10
+    DB_POOL_RECYCLE = 1800
+    DB_POOL_TIMEOUT = 30
+    DB_STATEMENT_TIMEOUT_MS = 15000
+
+    # SQLite pragmas
+    SQLITE_JOURNAL_MODE = 'WAL'
+    SQLITE_SYNCHRONOUS = 'NORMAL'
+    SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+    SQLITE_BUSY_TIMEOUT_MS = 5000
+
+    # Only /events also takes ?jwt=<token>, since EventSource cannot set headers
+    JWT_TOKEN_LOCATION = ['headers']
+
+    # /events fan-out: 'local' (this process only) or 'redis' (EVENT_BROKER_URL)
+    EVENT_BROKER = 'local'
+    # False when a separate gevent server (app:create_events_app) takes /events
+    SERVE_EVENTS = True
+
+    # 'file' shares data versions between workers through instance/; see versions.py
+    DATA_VERSIONS = 'file'
+
+    # Public job list/detail responses: 'local', 'shared-memory', 'redis' or 'none'
+    RESPONSE_CACHE = 'local'
+    RESPONSE_CACHE_TTL = 30
+    RESPONSE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+    # Opt-in request instrumentation: Server-Timing, /metrics and sampled cProfile dumps
+    INSTRUMENTATION = False
+    METRICS_TOKEN = None  # /metrics is only served, to this bearer token, when set
+    PROFILE_SAMPLE_RATE = 0.05
+    PROFILE_THRESHOLD_MS = 500
+    PROFILE_DIR = None  # defaults to instance/profiles
+
+    # Background tasks: 'thread' runs them in each web process, 'none' leaves them to `flask run-tasks`
+    TASK_RUNNER = 'thread'
+
+    # CORS (also read by flask_cors)
+    CORS_ORIGINS = ['http://localhost:5173', 'http://localhost:3000']
+    CORS_METHODS = ['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS']
+    CORS_ALLOW_HEADERS = ['Content-Type', 'Authorization', 'X-Requested-With', 'Idempotency-Key']
+    CORS_SUPPORTS_CREDENTIALS = True
+    CORS_MAX_AGE = 86400
+
+    def __init__(self):
+        self.SQLALCHEMY_DATABASE_URI = _database_uri()
+        self.JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key')
+        self.RESPONSE_CACHE = os.environ.get('RESPONSE_CACHE', self.RESPONSE_CACHE)
+        self.RESPONSE_CACHE_URL = os.environ.get('RESPONSE_CACHE_URL')
+        self.EVENT_BROKER = os.environ.get('EVENT_BROKER', self.EVENT_BROKER)
+        self.EVENT_BROKER_URL = os.environ.get('EVENT_BROKER_URL')
+        self.SERVE_EVENTS = os.environ.get('SERVE_EVENTS', '1').lower() not in ('0', 'false', 'no')
+        self.INSTRUMENTATION = os.environ.get('INSTRUMENTATION', '').lower() in ('1', 'true', 'yes')
+        self.METRICS_TOKEN = os.environ.get('METRICS_TOKEN', self.METRICS_TOKEN)
+        self.PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', self.PROFILE_SAMPLE_RATE))
+        self.PROFILE_DIR = os.environ.get('PROFILE_DIR', self.PROFILE_DIR)
+        self.TASK_RUNNER = os.environ.get('TASK_RUNNER', self.TASK_RUNNER)
+        for name in ('DB_POOL_SIZE', 'DB_MAX_OVERFLOW', 'DB_POOL_RECYCLE', 'DB_POOL_TIMEOUT',
+                     'DB_STATEMENT_TIMEOUT_MS', 'SQLITE_MMAP_SIZE', 'SQLITE_BUSY_TIMEOUT_MS', 'CORS_MAX_AGE',
+                     'RESPONSE_CACHE_TTL', 'RESPONSE_CACHE_MAX_BYTES', 'PROFILE_THRESHOLD_MS'):
+            setattr(self, name, _env_int(name, getattr(self, name)))
+        self.SQLALCHEMY_ENGINE_OPTIONS = engine_options(self)
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+
+
+class ProductionConfig(Config):
+    DB_POOL_SIZE = 10
+    DB_MAX_OVERFLOW = 20
+
+
+class TestingConfig(Config):
+    TESTING = True
+    BCRYPT_LOG_ROUNDS = 4
+    PASSWORD_HASH_WORKERS = 0
+    DATA_VERSIONS = 'memory'
+    TASK_RUNNER = 'none'
+
+    def __init__(self):
+        super().__init__()
+        self.SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URI', 'sqlite://')
+        self.SQLALCHEMY_ENGINE_OPTIONS = engine_options(self)
+
+
+profiles = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+    'testing': TestingConfig,
+}
+
+
+def get_config(name=None):
+    name = name or os.environ.get('APP_ENV', 'development')
+    return profiles[name]()
+
+
+def engine_options(config):
+    uri = config.SQLALCHEMY_DATABASE_URI
+    if uri.startswith('postgresql'):
+        return {
+            'pool_size': config.DB_POOL_SIZE,
+            'max_overflow': config.DB_MAX_OVERFLOW,
+            'pool_recycle': config.DB_POOL_RECYCLE,
+            'pool_timeout': config.DB_POOL_TIMEOUT,
+            'pool_pre_ping': True,
+            'connect_args': {'options': f'-c statement_timeout={config.DB_STATEMENT_TIMEOUT_MS}'},
+        }
+    if uri.startswith('sqlite'):
+        # sqlite3's own timeout is the busy handler; the pragmas are set per
+        # connection in database.py.
+        return {'connect_args': {'timeout': config.SQLITE_BUSY_TIMEOUT_MS / 1000}}
+    return {}
@@ -0,0 +1,29 @@
+class PreflightMiddleware:
+    """Answer CORS preflights for known origins before Flask sees them.
+
+    Browsers send an OPTIONS request ahead of most API calls; the answer only
+    depends on the Origin, so the headers are built once per origin at
+    startup. Anything else, including preflights from unknown origins, is
+    passed through to the app where flask_cors handles it as before.
+    """
+
+    def __init__(self, app, origins, methods, headers, max_age, supports_credentials=True):
+        self.app = app
+        shared = [
+            ('Access-Control-Allow-Methods', ', '.join(methods)),
+            ('Access-Control-Allow-Headers', ', '.join(headers)),
+            ('Access-Control-Max-Age', str(max_age)),
+            ('Vary', 'Origin'),
+            ('Content-Length', '0'),
+        ]
+        if supports_credentials:
+            shared.append(('Access-Control-Allow-Credentials', 'true'))
+        self.responses = {origin: [('Access-Control-Allow-Origin', origin)] + shared for origin in origins}
+
+    def __call__(self, environ, start_response):
+        if environ.get('REQUEST_METHOD') == 'OPTIONS' and 'HTTP_ACCESS_CONTROL_REQUEST_METHOD' in environ:
+            headers = self.responses.get(environ.get('HTTP_ORIGIN'))
+            if headers is not None:
+                start_response('204 No Content', list(headers))
+                return []
+        return self.app(environ, start_response)
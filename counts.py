@@ -0,0 +1,87 @@
+import json
+import math
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import versions
+from cache import TTLCache
+from models import db, Job
+
+COUNT_MODES = ('exact', 'estimate', 'none')
+
+# Totals for filtered job listings, keyed by the normalized filter tuple and
+# the jobs data version, so a write from any process that bumps the version
+# (as the ETag does) retires them. ORM writes to Job in this process also
+# clear the cache once they commit; clearing at flush time would let a
+# concurrent request re-cache the pre-commit total. The TTL bounds staleness
+# from writers that bump nothing.
+_job_counts = TTLCache(maxsize=2048, ttl=60)
+
+
+def filter_key(*values):
+    return tuple(' '.join(value.lower().split()) for value in values)
+
+
+def invalidate_job_counts(*args):
+    _job_counts.clear()
+
+
+@event.listens_for(Session, 'after_flush')
+def _note_job_writes(session, flush_context):
+    if any(isinstance(instance, Job) for instance in (*session.new, *session.dirty, *session.deleted)):
+        session.info['job_counts_stale'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('job_counts_stale', False):
+        invalidate_job_counts()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_job_writes(session):
+    session.info.pop('job_counts_stale', None)
+
+
+def _exact(query):
+    return query.order_by(None).count()
+
+
+def _estimate(query):
+    # Postgres can give a planner estimate for free; everywhere else the
+    # exact count is the only number available.
+    if db.engine.dialect.name != 'postgresql':
+        return _exact(query)
+    compiled = query.order_by(None).statement.compile(dialect=db.engine.dialect)
+    plan = db.session.connection().exec_driver_sql(f'EXPLAIN (FORMAT JSON) {compiled}', compiled.params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def count_jobs(query, key, mode='exact'):
+    """Return (total, estimated) for a filtered Job query, or (None, False) for mode 'none'."""
+    if mode == 'none':
+        return None, False
+
+    key = (versions.get('jobs'), *key)
+    cached = _job_counts.get(key)
+    if cached is not None:
+        total, estimated = cached
+        if mode == 'estimate' or not estimated:
+            return total, estimated
+
+    if mode == 'estimate':
+        total = _estimate(query)
+        estimated = db.engine.dialect.name == 'postgresql'
+    else:
+        total, estimated = _exact(query), False
+    _job_counts.set(key, (total, estimated))
+    return total, estimated
+
+
+def page_count(total, per_page):
+    if total is None:
+        return None
+    return math.ceil(total / per_page) if per_page else 0
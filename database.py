@@ -0,0 +1,34 @@
+from sqlalchemy import event
+
+from models import db
+
+
+def _sqlite_pragmas(config):
+    pragmas = [
+        f"PRAGMA journal_mode={config['SQLITE_JOURNAL_MODE']}",
+        f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}",
+        f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+    ]
+
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    return on_connect
+
+
+def init_db(app):
+    """Bind the shared SQLAlchemy object to `app` and tune its engine.
+
+    WAL lets readers in other gunicorn workers carry on while one writes,
+    and busy_timeout makes concurrent writers wait instead of failing with
+    "database is locked".
+    """
+    db.init_app(app)
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name == 'sqlite' and 'SQLITE_JOURNAL_MODE' in app.config:
+            event.listen(engine, 'connect', _sqlite_pragmas(app.config))
@@ -0,0 +1,154 @@
+import itertools
+import json
+import queue
+import threading
+import time
+
+from flask import Response
+
+# In-process pub/sub for pushing status changes to connected clients. Each
+# subscriber gets a bounded queue; a client too slow to drain it misses
+# events rather than holding memory. The local broker only reaches
+# subscribers in the publishing process; EVENT_BROKER = 'redis' installs
+# RedisBroker, which relays through Redis pub/sub to every process. Anything
+# else with the same subscribe/unsubscribe/publish methods can be installed
+# with set_broker() without touching the routes.
+
+KEEPALIVE_SECONDS = 15
+QUEUE_SIZE = 100
+
+
+class LocalBroker:
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self, channel):
+        subscription = queue.Queue(maxsize=QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, channel, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+    def publish(self, channel, event, data):
+        message = (next(self._ids), event, data)
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.put_nowait(message)
+            except queue.Full:
+                pass
+        return len(subscribers)
+
+
+class RedisBroker:
+    """Relays events through Redis pub/sub to subscribers in every process.
+
+    Each process keeps a LocalBroker for its own streams and, from the first
+    subscription on, one listener thread feeding it from Redis.
+    """
+
+    def __init__(self, url, prefix='workbridge:events:'):
+        import redis
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+        self._local = LocalBroker()
+        self._listener = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='events', daemon=True)
+                self._listener.start()
+        return self._local.subscribe(channel)
+
+    def unsubscribe(self, channel, subscription):
+        self._local.unsubscribe(channel, subscription)
+
+    def publish(self, channel, event, data):
+        return self._client.publish(self._prefix + channel, json.dumps([event, data], separators=(',', ':')))
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(self._prefix + '*')
+                for message in pubsub.listen():
+                    channel = message['channel'].decode('utf-8')[len(self._prefix):]
+                    event, data = json.loads(message['data'])
+                    self._local.publish(channel, event, data)
+            except Exception:
+                # Lost the connection; events published meanwhile are missed.
+                time.sleep(1)
+
+
+_broker = LocalBroker()
+
+
+def init_app(app):
+    if app.config.get('EVENT_BROKER', 'local') == 'redis':
+        set_broker(RedisBroker(app.config['EVENT_BROKER_URL']))
+
+
+def is_shared():
+    """Whether events published here reach subscribers in other processes."""
+    return not isinstance(_broker, LocalBroker)
+
+
+def set_broker(broker):
+    global _broker
+    _broker = broker
+
+
+def get_broker():
+    return _broker
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+def publish_to_user(user_id, event, data):
+    return _broker.publish(user_channel(user_id), event, data)
+
+
+def _format(event_id, event, data):
+    return f'id: {event_id}\nevent: {event}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'
+
+
+def response(user_id):
+    return Response(stream(user_id), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+def stream(user_id, keepalive=KEEPALIVE_SECONDS):
+    """Yield server-sent-event frames for `user_id` until the client goes away.
+
+    The generator blocks on a queue, not a database connection, so under an
+    async worker (gunicorn -k gevent) an idle stream costs one greenlet.
+    """
+    channel = user_channel(user_id)
+    subscription = _broker.subscribe(channel)
+    try:
+        yield 'retry: 3000\n\n'
+        while True:
+            try:
+                message = subscription.get(timeout=keepalive)
+            except queue.Empty:
+                yield ': keepalive\n\n'
+                continue
+            yield _format(*message)
+    finally:
+        _broker.unsubscribe(channel, subscription)
@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+
+from flask import Response, stream_with_context
+
+from models import db
+
+# Streaming NDJSON/CSV exports. Rows are fetched in partitions (a server-side
+# cursor on Postgres) and each partition is written out before the next is
+# read, so memory stays flat however many rows the export has.
+
+FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+PARTITION_SIZE = 1000
+
+
+def _flatten(record, prefix=''):
+    flat = {}
+    for name, value in record.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f'{prefix}{name}.'))
+        else:
+            flat[f'{prefix}{name}'] = value
+    return flat
+
+
+def _ndjson(partitions, render):
+    for rows in partitions:
+        yield ''.join(json.dumps(render(row), separators=(',', ':')) + '\n' for row in rows)
+
+
+def _csv(partitions, render, fields):
+    # The header comes from the first row so nested fields (job -> job.title)
+    # are expanded the same way as the rows.
+    buffer = io.StringIO()
+    writer = None
+    for rows in partitions:
+        records = [_flatten(render(row)) for row in rows]
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(records[0]), extrasaction='ignore')
+            writer.writeheader()
+        writer.writerows(records)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if writer is None:
+        yield ','.join(fields) + '\r\n'
+
+
+def stream(statement, render, fields, fmt, filename):
+    def generate():
+        result = db.session.execute(statement.execution_options(stream_results=True, yield_per=PARTITION_SIZE))
+        try:
+            partitions = result.partitions()
+            if fmt == 'csv':
+                yield from _csv(partitions, render, fields)
+            else:
+                yield from _ndjson(partitions, render)
+        finally:
+            result.close()
+
+    return Response(stream_with_context(generate()), mimetype=FORMATS[fmt], headers={
+        'Content-Disposition': f'attachment; filename="{filename}.{fmt}"',
+        'Cache-Control': 'no-store',
+    })
@@ -0,0 +1,88 @@
+from sqlalchemy import Integer, String, cast, func, literal, select, union_all
+
+from models import db, Job, Tag, job_tags
+
+# Facet counts for job listings. Every requested facet is a GROUP BY over
+# one CTE of the filtered jobs, and they all come back as a single UNION ALL
+# result set, so asking for more facets adds no round trips.
+#
+# The salary histogram never has more than MAX_SALARY_BUCKETS buckets: when
+# the requested width would give more, adjacent buckets are merged into
+# wider ones (a whole multiple of the requested width).
+
+FACETS = ('location', 'job_type', 'tags', 'salary')
+FACET_LIMIT = 20
+SALARY_BUCKET = 10000
+MIN_SALARY_BUCKET = 1000
+MAX_SALARY_BUCKET = 10 ** 9
+MAX_SALARY_BUCKETS = 50
+
+
+def parse(value):
+    """`facets=1` asks for every facet, otherwise a comma-separated list."""
+    if value in ('1', 'true', 'all'):
+        return list(FACETS)
+    names = [name for name in value.split(',') if name]
+    if any(name not in FACETS for name in names):
+        raise ValueError(value)
+    return names
+
+
+def _salary_bucket(salary, width):
+    # Salaries are never negative, so truncation is floor; Postgres rounds
+    # when casting a float to integer and needs floor() spelled out.
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return cast(func.floor(salary / width), Integer)
+    return cast(salary / width, Integer)
+
+
+def facets(query, names=FACETS, limit=FACET_LIMIT, bucket=SALARY_BUCKET):
+    """Counts per location, job_type and tag, plus a salary histogram, for the jobs `query` matches."""
+    matched = query.with_entities(Job.id, Job.location, Job.job_type, Job.salary).order_by(None).cte('matched')
+    parts = []
+    if 'location' in names:
+        parts.append(select(literal('location').label('facet'), matched.c.location.label('value'), func.count().label('n'))
+                     .group_by(matched.c.location))
+    if 'job_type' in names:
+        parts.append(select(literal('job_type'), matched.c.job_type, func.count())
+                     .group_by(matched.c.job_type))
+    if 'tags' in names:
+        parts.append(select(literal('tags'), Tag.name, func.count())
+                     .select_from(matched)
+                     .join(job_tags, job_tags.c.job_id == matched.c.id)
+                     .join(Tag, Tag.id == job_tags.c.tag_id)
+                     .group_by(Tag.name))
+    if 'salary' in names:
+        # The bucket number travels as text so it fits the union's value column.
+        number = _salary_bucket(matched.c.salary, bucket)
+        parts.append(select(literal('salary'), cast(number, String), func.count())
+                     .group_by(number))
+    result = {name: [] for name in names}
+    if not parts:
+        return result
+    salaries = {}
+    for facet, value, count in db.session.execute(union_all(*parts)):
+        if facet == 'salary':
+            salaries[int(value)] = count
+        else:
+            result[facet].append({'value': value, 'count': count})
+    if 'salary' in names:
+        result['salary'] = _histogram(salaries, bucket)
+    for name, values in result.items():
+        if name != 'salary':
+            values.sort(key=lambda item: (-item['count'], item['value']))
+            del values[limit:]
+    return result
+
+
+def _histogram(counts, width):
+    """Turn {bucket number: count} into sorted buckets, merging them to fit MAX_SALARY_BUCKETS."""
+    if not counts:
+        return []
+    factor = -(-(max(counts) - min(counts) + 1) // MAX_SALARY_BUCKETS)
+    if factor > 1:
+        merged = {}
+        for number, count in counts.items():
+            merged[number // factor] = merged.get(number // factor, 0) + count
+        counts, width = merged, width * factor
+    return [{'min': number * width, 'max': (number + 1) * width, 'count': counts[number]} for number in sorted(counts)]
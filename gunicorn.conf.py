@@ -0,0 +1,30 @@
+import os
+
+# The API. Threaded workers: sqlite3, psycopg2 and bcrypt all block, and
+# under gevent one slow query or hash would stall every request on the
+# worker.
+#
+# /events is not served here, since every open stream would hold one of
+# these threads. gunicorn.events.conf.py serves it on gevent, where an idle
+# stream costs a greenlet; run both and have the proxy send /events to
+# EVENTS_PORT:
+#
+#     gunicorn -c gunicorn.conf.py
+#     gunicorn -c gunicorn.events.conf.py
+#
+# Events published by the API workers (and `flask run-tasks`) only reach the
+# events server through a shared broker, so both need EVENT_BROKER=redis.
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+timeout = 60
+keepalive = 5
+wsgi_app = 'app:create_app()'
+raw_env = ['SERVE_EVENTS=0']
+
+
+def on_starting(server):
+    if os.environ.get('EVENT_BROKER', 'local') == 'local':
+        server.log.warning('EVENT_BROKER=local: events published by the API will not reach /events '
+                           'on the events server; set EVENT_BROKER=redis')
@@ -0,0 +1,17 @@
+import os
+
+# /events only (see gunicorn.conf.py). app:create_events_app does no
+# database or bcrypt work, so gevent is safe here: one greenlet per open
+# stream, thousands per worker. Events arrive through the shared broker.
+bind = f"0.0.0.0:{os.environ.get('EVENTS_PORT', 5001)}"
+workers = int(os.environ.get('EVENTS_WORKERS', 1))
+worker_class = 'gevent'
+worker_connections = int(os.environ.get('EVENTS_WORKER_CONNECTIONS', 10000))
+timeout = 60
+keepalive = 5
+wsgi_app = 'app:create_events_app()'
+
+
+def on_starting(server):
+    if os.environ.get('EVENT_BROKER', 'local') != 'redis':
+        raise SystemExit('The events server needs EVENT_BROKER=redis to receive events from the API')
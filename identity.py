@@ -0,0 +1,59 @@
+from collections import namedtuple
+
+from flask_jwt_extended import get_jwt, get_jwt_identity
+
+from cache import TTLCache
+from models import db, User
+
+Identity = namedtuple('Identity', ['id', 'username', 'role'])
+
+PROFILE_FIELDS = ('id', 'username', 'role', 'name', 'phone', 'location', 'skills', 'experience', 'resume_url')
+UserSnapshot = namedtuple('UserSnapshot', PROFILE_FIELDS)
+
+# Read-only copies of User rows for handlers that need profile fields.
+# update_profile drops the entry it changed; the TTL covers other processes.
+_snapshots = TTLCache(maxsize=4096, ttl=300)
+
+
+def snapshot(user):
+    return UserSnapshot(*(getattr(user, field) for field in PROFILE_FIELDS))
+
+
+def invalidate_user(user_id):
+    _snapshots.pop(user_id)
+
+
+def _load(user_id, username):
+    if user_id is not None:
+        return db.session.get(User, user_id)
+    return User.query.filter_by(username=username).first()
+
+
+def current_user():
+    """Profile snapshot for the authenticated user, or None if the row is gone."""
+    user_id = get_jwt().get('user_id')
+    key = user_id if user_id is not None else ('username', get_jwt_identity())
+    cached = _snapshots.get(key)
+    if cached is not None:
+        return cached
+    user = _load(user_id, get_jwt_identity())
+    if user is None:
+        return None
+    cached = snapshot(user)
+    _snapshots.set(key, cached)
+    return cached
+
+
+def current_identity():
+    """Who is calling, straight from the token claims set by login.
+
+    Only tokens that lack the user_id/role claims fall back to the cached
+    snapshot, so most authenticated requests never touch the database here.
+    """
+    claims = get_jwt()
+    if claims.get('user_id') is not None and claims.get('role') is not None:
+        return Identity(claims['user_id'], get_jwt_identity(), claims['role'])
+    user = current_user()
+    if user is None:
+        return None
+    return Identity(user.id, user.username, user.role)
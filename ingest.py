@@ -0,0 +1,192 @@
+import csv
+import io
+import json
+import math
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import func, insert, select
+
+import cache
+import counts
+import tags
+import versions
+from models import db, Job
+
+# Bulk job ingestion from NDJSON or CSV streams. Records are validated and
+# inserted a chunk at a time (executemany, or COPY on Postgres) and committed
+# every few chunks, so memory stays flat however long the feed is and a bad
+# row only costs that row.
+#
+# Commits are partial by design: validate() rejects anything the database
+# would, so a feed is not expected to fail midway, but if the database does
+# fail (or the connection drops) the chunks committed before that point stay
+# in. Re-sending the rest of the feed is the caller's job.
+#
+# Streams are decoded with errors='surrogateescape', so bytes that are not
+# UTF-8 reach validate() and fail that row instead of the whole request.
+
+CHUNK_SIZE = 1000
+CHUNKS_PER_TRANSACTION = 10
+MAX_REPORTED_ERRORS = 100
+COLUMNS = ('title', 'description', 'location', 'salary', 'job_type', 'employer_id')
+_LIMITS = {'title': 100, 'location': 100, 'job_type': 50}
+
+
+class RowError(ValueError):
+    pass
+
+
+def read_ndjson(stream):
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, RowError(f'invalid JSON: {e}')
+            continue
+        if not isinstance(record, dict):
+            yield line_no, RowError('expected a JSON object')
+            continue
+        yield line_no, record
+
+
+def read_csv(stream):
+    # Line 1 is the header row.
+    for line_no, record in enumerate(csv.DictReader(stream), start=2):
+        yield line_no, record
+
+
+def open_text(stream):
+    return io.TextIOWrapper(stream, encoding='utf-8', errors='surrogateescape', newline='')
+
+
+def _check_encoding(name, value):
+    try:
+        value.encode('utf-8')
+    except UnicodeEncodeError:
+        raise RowError(f'{name} is not valid UTF-8')
+
+
+def validate(record, employer_id=None):
+    row = {}
+    for name in ('title', 'description', 'location'):
+        value = record.get(name)
+        if not isinstance(value, str) or not value.strip():
+            raise RowError(f'{name} is required')
+        _check_encoding(name, value)
+        row[name] = value.strip()
+    job_type = record.get('job_type') or 'full-time'
+    if not isinstance(job_type, str):
+        raise RowError('job_type must be a string')
+    _check_encoding('job_type', job_type)
+    row['job_type'] = job_type.strip()
+    for name, limit in _LIMITS.items():
+        if len(row[name]) > limit:
+            raise RowError(f'{name} is longer than {limit} characters')
+    try:
+        row['salary'] = float(record.get('salary', 0) or 0)
+    except (TypeError, ValueError):
+        raise RowError('salary must be a number')
+    if not math.isfinite(row['salary']):
+        raise RowError('salary must be a finite number')
+    if row['salary'] < 0:
+        raise RowError('salary must not be negative')
+    if employer_id is None:
+        try:
+            employer_id = int(record.get('employer_id'))
+        except (TypeError, ValueError):
+            raise RowError('employer_id must be an integer')
+    row['employer_id'] = employer_id
+    return row
+
+
+def _copy(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([row[column] for column in COLUMNS])
+    buffer.seek(0)
+    cursor = db.session.connection().connection.driver_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY job ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def _write(rows):
+    if db.session.get_bind().dialect.name == 'postgresql':
+        _copy(rows)
+    else:
+        db.session.execute(insert(Job), rows)
+
+
+def ingest(records, employer_id=None, chunk_size=CHUNK_SIZE, chunks_per_transaction=CHUNKS_PER_TRANSACTION):
+    """Validate and insert (line_no, record) pairs; return a summary with per-row errors."""
+    report = {'inserted': 0, 'failed': 0, 'errors': []}
+    chunk = []
+    pending = 0
+    last_id = db.session.scalar(select(func.max(Job.id))) or 0
+
+    def flush():
+        nonlocal pending
+        if chunk:
+            _write(chunk)
+            report['inserted'] += len(chunk)
+            chunk.clear()
+            pending += 1
+        if pending >= chunks_per_transaction:
+            db.session.commit()
+            pending = 0
+
+    try:
+        for line_no, record in records:
+            try:
+                if isinstance(record, RowError):
+                    raise record
+                chunk.append(validate(record, employer_id))
+            except RowError as e:
+                report['failed'] += 1
+                if len(report['errors']) < MAX_REPORTED_ERRORS:
+                    report['errors'].append({'line': line_no, 'error': str(e)})
+                continue
+            if len(chunk) >= chunk_size:
+                flush()
+        flush()
+        db.session.commit()
+        if report['inserted']:
+            tags.tag_jobs(after_id=last_id)
+    finally:
+        if report['inserted']:
+            _jobs_changed()
+    report['errors_truncated'] = report['failed'] > len(report['errors'])
+    return report
+
+
+def _jobs_changed():
+    # Core inserts bypass the ORM hooks that normally do this.
+    versions.bump('jobs')
+    cache.invalidate('jobs')
+    counts.invalidate_job_counts()
+
+
+def reader_for(fmt, stream):
+    return read_csv(stream) if fmt == 'csv' else read_ndjson(stream)
+
+
+@click.command('ingest-jobs')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['ndjson', 'csv']), default=None,
+              help='Defaults to the file extension.')
+@click.option('--employer-id', type=int, default=None, help='Override employer_id on every row.')
+@click.option('--chunk-size', type=int, default=CHUNK_SIZE)
+@with_appcontext
+def ingest_jobs_command(path, fmt, employer_id, chunk_size):
+    """Bulk-load jobs from an NDJSON or CSV file."""
+    fmt = fmt or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+    with open_text(open(path, 'rb')) as stream:
+        report = ingest(reader_for(fmt, stream), employer_id=employer_id, chunk_size=chunk_size)
+    click.echo(f"Inserted {report['inserted']} jobs, {report['failed']} rows failed.")
+    for error in report['errors']:
+        click.echo(f"  line {error['line']}: {error['error']}")
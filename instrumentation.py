@@ -0,0 +1,251 @@
+import cProfile
+import hmac
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+
+from flask import abort, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Opt-in request instrumentation (INSTRUMENTATION=1). For every request it
+# records wall time, query count, total SQL time and the slowest statement's
+# time, keyed by route rule. Per request these go out as a Server-Timing
+# header. /metrics serves them in Prometheus text format: a cumulative
+# latency histogram and counters for Prometheus to rate(), plus the same
+# histogram over a rolling window as gauges for a glance without a
+# Prometheus server. /metrics is only served when METRICS_TOKEN is set, to
+# requests bearing that token. Statement text is never exported. A sample of
+# requests runs under cProfile, and the profile is written to PROFILE_DIR if
+# the request took longer than PROFILE_THRESHOLD_MS. Metrics are per worker
+# process, like the other in-memory state.
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+WINDOW_SECONDS = 300
+SLOT_SECONDS = 60
+
+
+class Histogram:
+    """Latency histogram since the process started."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self._counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self):
+        """Return (cumulative bucket counts, count, sum)."""
+        return _cumulative(self._counts), self.count, self.sum
+
+
+def _cumulative(counts):
+    total = 0
+    result = []
+    for count in counts:
+        total += count
+        result.append(total)
+    return result
+
+
+class RollingHistogram:
+    """Latency histogram over the last WINDOW_SECONDS, in SLOT_SECONDS slots."""
+
+    def __init__(self, buckets=BUCKETS, window=WINDOW_SECONDS, slot=SLOT_SECONDS):
+        self.buckets = buckets
+        self.slot = slot
+        self._slots = [None] * (window // slot)
+
+    def _current(self, now):
+        tick = int(now // self.slot)
+        index = tick % len(self._slots)
+        entry = self._slots[index]
+        if entry is None or entry[0] != tick:
+            entry = self._slots[index] = [tick, [0] * len(self.buckets), 0, 0.0]
+        return entry
+
+    def observe(self, value, now=None):
+        entry = self._current(time.monotonic() if now is None else now)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                entry[1][i] += 1
+                break
+        entry[2] += 1
+        entry[3] += value
+
+    def snapshot(self, now=None):
+        """Return (cumulative bucket counts, count, sum) over the window."""
+        oldest = int((time.monotonic() if now is None else now) // self.slot) - len(self._slots) + 1
+        counts = [0] * len(self.buckets)
+        total, value_sum = 0, 0.0
+        for entry in self._slots:
+            if entry is None or entry[0] < oldest:
+                continue
+            for i, count in enumerate(entry[1]):
+                counts[i] += count
+            total += entry[2]
+            value_sum += entry[3]
+        return _cumulative(counts), total, value_sum
+
+
+class RouteStats:
+    def __init__(self):
+        self.latency = Histogram()
+        self.recent = RollingHistogram()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.slowest = 0.0
+
+
+class Metrics:
+    def __init__(self):
+        self._routes = defaultdict(RouteStats)
+        self._lock = threading.Lock()
+
+    def record(self, method, route, wall, queries, sql_seconds, slowest):
+        with self._lock:
+            stats = self._routes[method, route]
+            stats.latency.observe(wall)
+            stats.recent.observe(wall)
+            stats.queries += queries
+            stats.sql_seconds += sql_seconds
+            stats.slowest = max(stats.slowest, slowest)
+
+    def render(self):
+        with self._lock:
+            rows = []
+            for (method, route), stats in sorted(self._routes.items()):
+                labels = f'method="{_escape(method)}",route="{_escape(route)}"'
+                rows.append((labels, stats.latency.snapshot(), stats.recent.snapshot(),
+                             stats.queries, stats.sql_seconds, stats.slowest))
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.extend(samples)
+
+        def buckets(name, labels, snapshot):
+            counts, count, value_sum = snapshot
+            for bound, cumulative in zip(BUCKETS, counts):
+                yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+            yield f'{name}_bucket{{{labels},le="+Inf"}} {count}'
+            yield f'{name}_sum{{{labels}}} {value_sum:.6f}'
+            yield f'{name}_count{{{labels}}} {count}'
+
+        family('workbridge_request_duration_seconds', 'histogram', 'Request wall time.',
+               [line for row in rows for line in buckets('workbridge_request_duration_seconds', row[0], row[1])])
+        # A rolling window goes down as well as up, so it cannot be a histogram.
+        family('workbridge_recent_request_duration_seconds', 'gauge',
+               f'Request wall time over the last {WINDOW_SECONDS}s.',
+               [line for row in rows for line in buckets('workbridge_recent_request_duration_seconds', row[0], row[2])])
+        family('workbridge_sql_queries_total', 'counter', 'SQL statements executed.',
+               [f'workbridge_sql_queries_total{{{row[0]}}} {row[3]}' for row in rows])
+        family('workbridge_sql_seconds_total', 'counter', 'Time spent in SQL statements.',
+               [f'workbridge_sql_seconds_total{{{row[0]}}} {row[4]:.6f}' for row in rows])
+        family('workbridge_slowest_query_seconds', 'gauge', 'Slowest single statement seen per route.',
+               [f'workbridge_slowest_query_seconds{{{row[0]}}} {row[5]:.6f}' for row in rows])
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+_profile_lock = threading.Lock()
+_listening = False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'instrument' in g:
+        conn.info.setdefault('instrument_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('instrument_started')
+    if not started or not has_request_context() or 'instrument' not in g:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    data = g.instrument
+    data['queries'] += 1
+    data['sql'] += elapsed
+    data['slowest'] = max(data['slowest'], elapsed)
+
+
+def _start():
+    g.instrument = {'started': time.perf_counter(), 'queries': 0, 'sql': 0.0, 'slowest': 0.0, 'profile': None}
+    if random.random() < current_app.config['PROFILE_SAMPLE_RATE'] and _profile_lock.acquire(blocking=False):
+        # Only one profiler can run at a time; other requests just skip sampling.
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+            g.instrument['profile'] = profile
+        except ValueError:
+            _profile_lock.release()
+
+
+def _finish(app, response):
+    data = g.get('instrument')
+    if data is None:
+        return response
+    wall = data['wall'] = time.perf_counter() - data['started']
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    app.extensions['metrics'].record(request.method, route, wall,
+                                     data['queries'], data['sql'], data['slowest'])
+    timing = [f'app;dur={wall * 1000:.1f}', f'db;dur={data["sql"] * 1000:.1f};desc="{data["queries"]} queries"']
+    if data['queries']:
+        timing.append(f'db-slowest;dur={data["slowest"] * 1000:.1f}')
+    response.headers.add('Server-Timing', ', '.join(timing))
+    return response
+
+
+def _teardown(app, exc):
+    # Runs even when the view raised, so the profiler is always released.
+    data = g.pop('instrument', None)
+    if data is None or data['profile'] is None:
+        return
+    profile = data['profile']
+    profile.disable()
+    _profile_lock.release()
+    wall = data.get('wall') or time.perf_counter() - data['started']
+    if wall * 1000 >= app.config['PROFILE_THRESHOLD_MS']:
+        directory = app.config['PROFILE_DIR'] or os.path.join(app.instance_path, 'profiles')
+        os.makedirs(directory, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{request.method}-{request.endpoint or 'unmatched'}-{wall * 1000:.0f}ms.prof"
+        profile.dump_stats(os.path.join(directory, name))
+
+
+def init_app(app):
+    if not app.config.get('INSTRUMENTATION'):
+        return
+    global _listening
+    if not _listening:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        _listening = True
+
+    app.extensions['metrics'] = Metrics()
+    app.before_request(_start)
+    app.after_request(lambda response: _finish(app, response))
+    app.teardown_request(lambda exc: _teardown(app, exc))
+
+    token = app.config.get('METRICS_TOKEN')
+    if not token:
+        return
+
+    @app.route('/metrics')
+    def metrics():
+        scheme, _, given = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not hmac.compare_digest(given.encode(), token.encode()):
+            abort(401)
+        return app.extensions['metrics'].render(), 200, {'Content-Type': 'text/plain; version=0.0.4'}
@@ -1,9 +1,13 @@
 from flask_sqlalchemy import SQLAlchemy
-import bcrypt
+import passwords
 
 db = SQLAlchemy()
 
 class User(db.Model):
+    __table_args__ = (
+        db.Index('ix_user_username_role', 'username', 'role'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     password_hash = db.Column(db.String(128), nullable=False)
@@ -16,12 +20,22 @@ class User(db.Model):
     resume_url = db.Column(db.String(255))
 
     def set_password(self, password):
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        self.password_hash = passwords.hash_password(password)
 
     def check_password(self, password):
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        return passwords.check_password(password, self.password_hash)
+
+    def needs_rehash(self):
+        return passwords.needs_rehash(self.password_hash)
 
 class Job(db.Model):
+    __table_args__ = (
+        db.Index('ix_job_employer_id', 'employer_id', 'id'),
+        db.Index('ix_job_job_type', 'job_type', 'id'),
+        db.Index('ix_job_location', 'location'),
+        db.Index('ix_job_salary', 'salary', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=False)
@@ -30,13 +44,52 @@ class Job(db.Model):
     job_type = db.Column(db.String(50), nullable=False)
     employer_id = db.Column(db.Integer, nullable=False)
 
+class Tag(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False)
+
+job_tags = db.Table(
+    'job_tags',
+    db.Column('job_id', db.Integer, db.ForeignKey('job.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tag.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_job_tags_tag_id', 'tag_id', 'job_id'),
+)
+
+user_tags = db.Table(
+    'user_tags',
+    db.Column('user_id', db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tag.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_user_tags_tag_id', 'tag_id', 'user_id'),
+)
+
 class Application(db.Model):
+    __table_args__ = (
+        db.Index('uq_application_job_user', 'job_id', 'user_id', unique=True),
+        db.Index('ix_application_user_id', 'user_id', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     job_id = db.Column(db.Integer, db.ForeignKey('job.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     status = db.Column(db.String(50), default='pending')
 
+class ApplicationKey(db.Model):
+    # Outcome of the first apply request per Idempotency-Key, for replays.
+    __table_args__ = (
+        db.Index('ix_application_key_created_at', 'created_at'),
+    )
+
+    user_id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(200), primary_key=True)
+    outcome = db.Column(db.String(20), nullable=False)
+    created_at = db.Column(db.Float, nullable=False)
+
 class Interview(db.Model):
+    __table_args__ = (
+        db.Index('ix_interview_application_id', 'application_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     application_id = db.Column(db.Integer, db.ForeignKey('application.id'), nullable=False)
     date = db.Column(db.String(50), nullable=False)
@@ -44,4 +97,37 @@ class Interview(db.Model):
     location = db.Column(db.String(200), nullable=False)
     notes = db.Column(db.Text)
 
+class Task(db.Model):
+    __table_args__ = (
+        db.Index('ix_task_status_run_at', 'status', 'run_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    idempotency_key = db.Column(db.String(200), unique=True)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False)
+    # Unix timestamps, so due-task comparisons are plain numbers on every dialect.
+    run_at = db.Column(db.Float, nullable=False)
+    locked_until = db.Column(db.Float)
+    created_at = db.Column(db.Float, nullable=False)
+    last_error = db.Column(db.Text)
+
+
+def insert_ignore_statement(model, dialect=None):
+    """INSERT ... ON CONFLICT DO NOTHING for `dialect`, by default the session's."""
+    dialect = dialect or db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        raise NotImplementedError(f'insert_ignore is not supported on {dialect}')
+    return insert(model).on_conflict_do_nothing()
+
 
+def insert_ignore(model, values):
+    """INSERT that silently skips rows hitting a unique index; returns the number inserted."""
+    return db.session.execute(insert_ignore_statement(model).values(values)).rowcount
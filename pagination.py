@@ -0,0 +1,99 @@
+import base64
+import binascii
+import hashlib
+import json
+
+from sqlalchemy import and_, or_
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def signature(keys):
+    """A short tag for the sort keys, so a cursor only resumes the ordering it came from."""
+    spec = ','.join(f"{column}{' desc' if descending else ''}" for column, descending in keys)
+    return hashlib.blake2b(spec.encode('utf-8'), digest_size=4).hexdigest()
+
+
+def encode_cursor(values, sort=''):
+    raw = json.dumps([sort, list(values)], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort=''):
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        tag, values = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursor(cursor)
+    if tag != sort or not isinstance(values, list):
+        raise InvalidCursor(cursor)
+    return values
+
+
+def _python_type(column):
+    try:
+        return column.type.python_type
+    except (AttributeError, NotImplementedError):
+        return None
+
+
+def _check_values(keys, values):
+    if len(values) != len(keys):
+        return False
+    for (column, _), value in zip(keys, values):
+        if value is None or isinstance(value, (bool, list, dict)):
+            return False
+        expected = _python_type(column)
+        if expected in (int, float):
+            if not isinstance(value, (int, float)) or (expected is int and not isinstance(value, int)):
+                return False
+        elif expected is str and not isinstance(value, str):
+            return False
+    return True
+
+
+def ordering(keys):
+    """`keys` is a list of (column, descending) pairs; the last one must be unique."""
+    return [column.desc() if descending else column.asc() for column, descending in keys]
+
+
+def _seek(keys, values):
+    # (a, b, c) > (x, y, z) expanded as a > x OR (a = x AND b > y) OR ...,
+    # which also works when the keys are sorted in different directions.
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        prefix = [keys[j][0] == values[j] for j in range(i)]
+        step = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*prefix, step))
+    return or_(*clauses)
+
+
+def keyset_page(query, keys, cursor, limit):
+    """Return (rows, next_cursor) for the page after `cursor`.
+
+    Seeks on the sort keys instead of using OFFSET, so every page costs the
+    same however deep it is. One extra row is fetched to find out whether
+    there is a next page.
+    """
+    if limit < 1:
+        raise ValueError('limit must be at least 1')
+    sort = signature(keys)
+    values = decode_cursor(cursor, sort)
+    if values is not None:
+        if not _check_values(keys, values):
+            raise InvalidCursor(cursor)
+        query = query.filter(_seek(keys, values))
+
+    columns = [column for column, _ in keys]
+    rows = query.add_columns(*columns).order_by(*ordering(keys)).limit(limit + 1).all()
+
+    width = len(keys)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][-width:], sort)
+    return [row[:-width] for row in rows], next_cursor
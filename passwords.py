@@ -0,0 +1,96 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, has_app_context, has_request_context
+
+# bcrypt runs on a small dedicated pool so a burst of logins or registrations
+# cannot use more than PASSWORD_HASH_WORKERS cores. bcrypt releases the GIL
+# while hashing, so threads are enough and, unlike a process pool, they do
+# not re-import the main module of whatever script is running. The semaphore
+# bounds how many hashes may be queued or running at once; past that callers
+# get PasswordServiceBusy, which app.py turns into a 503 with Retry-After.
+# Scripts and CLI commands (no request context) hash inline.
+
+DEFAULTS = {
+    'BCRYPT_LOG_ROUNDS': 12,
+    'PASSWORD_HASH_WORKERS': 2,
+    'PASSWORD_HASH_QUEUE_DEPTH': 16,
+    'PASSWORD_HASH_RETRY_AFTER': 1,
+}
+
+_pool = None
+_slots = None
+_lock = threading.Lock()
+
+
+class PasswordServiceBusy(Exception):
+    def __init__(self, retry_after):
+        super().__init__('Password hashing queue is full')
+        self.retry_after = retry_after
+
+
+def _setting(name):
+    if has_app_context() and name in current_app.config:
+        return int(current_app.config[name])
+    return int(os.environ.get(name, DEFAULTS[name]))
+
+
+def _hash(password, rounds):
+    import bcrypt
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check(password, password_hash):
+    import bcrypt
+    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+
+def _executor():
+    global _pool, _slots
+    with _lock:
+        if _pool is None:
+            workers = _setting('PASSWORD_HASH_WORKERS')
+            _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+            _slots = threading.BoundedSemaphore(_setting('PASSWORD_HASH_QUEUE_DEPTH'))
+        return _pool, _slots
+
+
+def _run(fn, *args):
+    if not has_request_context() or _setting('PASSWORD_HASH_WORKERS') <= 0:
+        return fn(*args)
+    pool, slots = _executor()
+    if not slots.acquire(blocking=False):
+        raise PasswordServiceBusy(_setting('PASSWORD_HASH_RETRY_AFTER'))
+    try:
+        return pool.submit(fn, *args).result()
+    finally:
+        slots.release()
+
+
+def shutdown():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+def hash_password(password):
+    return _run(_hash, password, _setting('BCRYPT_LOG_ROUNDS'))
+
+
+def check_password(password, password_hash):
+    return _run(_check, password, password_hash)
+
+
+def hash_cost(password_hash):
+    # $2b$12$<salt+hash>
+    try:
+        return int(password_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def needs_rehash(password_hash):
+    return hash_cost(password_hash) != _setting('BCRYPT_LOG_ROUNDS')
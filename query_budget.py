@@ -0,0 +1,131 @@
+import threading
+from collections import Counter
+from contextlib import ContextDecorator
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Query budgets: catch N+1 queries and repeated statements before they ship.
+#
+#     with query_budget(2):
+#         client.get('/employer/applications')
+#
+# fails if the block runs more than two statements, the same statement with
+# the same parameters twice, or the same statement text more than
+# REPEAT_THRESHOLD times with different parameters (the N+1 shape).
+# enforce(app, budgets) applies the same check to every request, with
+# budgets keyed by endpoint name. Queries a streamed response body runs
+# after the view returns are only seen by the context manager.
+
+REPEAT_THRESHOLD = 3
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class Recorder:
+    def __init__(self):
+        self.statements = []
+
+    def __len__(self):
+        return len(self.statements)
+
+    def duplicates(self):
+        """Statements run more than once with identical parameters."""
+        counts = Counter(self.statements)
+        return {statement: n for statement, n in counts.items() if n > 1}
+
+    def repeats(self, threshold=REPEAT_THRESHOLD):
+        """Statement texts run more than `threshold` times, whatever the parameters."""
+        counts = Counter(statement for statement, _ in self.statements)
+        return {statement: n for statement, n in counts.items() if n > threshold}
+
+    def check(self, limit, label='block', allow_duplicates=False, repeat_threshold=REPEAT_THRESHOLD):
+        problems = []
+        if limit is not None and len(self) > limit:
+            problems.append(f'{len(self)} queries, budget is {limit}')
+        if not allow_duplicates:
+            problems.extend(f'ran {n}x with the same parameters: {statement}'
+                            for (statement, _), n in self.duplicates().items())
+        if repeat_threshold is not None:
+            problems.extend(f'ran {n}x (possible N+1): {statement}'
+                            for statement, n in self.repeats(repeat_threshold).items())
+        if problems:
+            listing = '\n'.join(f'  {i}. {statement}' for i, (statement, _) in enumerate(self.statements, start=1))
+            raise QueryBudgetExceeded(f'{label}: ' + '; '.join(problems) + f'\nStatements:\n{listing}')
+
+
+_active = []
+_lock = threading.Lock()
+_listening = False
+
+
+def _freeze(parameters):
+    try:
+        hash(parameters)
+        return parameters
+    except TypeError:
+        return repr(parameters)
+
+
+def _on_execute(conn, cursor, statement, parameters, context, executemany):
+    entry = (' '.join(statement.split()), _freeze(parameters))
+    with _lock:
+        for recorder in _active:
+            recorder.statements.append(entry)
+    if has_request_context():
+        recorder = g.get('query_budget')
+        if recorder is not None:
+            recorder.statements.append(entry)
+
+
+def _listen():
+    global _listening
+    with _lock:
+        if not _listening:
+            event.listen(Engine, 'before_cursor_execute', _on_execute)
+            _listening = True
+
+
+class query_budget(ContextDecorator):
+    """Context manager and decorator failing when the wrapped code exceeds its query budget."""
+
+    def __init__(self, limit=None, allow_duplicates=False, repeat_threshold=REPEAT_THRESHOLD):
+        self.limit = limit
+        self.allow_duplicates = allow_duplicates
+        self.repeat_threshold = repeat_threshold
+
+    def __enter__(self):
+        _listen()
+        self.recorder = Recorder()
+        with _lock:
+            _active.append(self.recorder)
+        return self.recorder
+
+    def __exit__(self, exc_type, exc, tb):
+        with _lock:
+            _active.remove(self.recorder)
+        if exc_type is None:
+            self.recorder.check(self.limit, allow_duplicates=self.allow_duplicates,
+                                repeat_threshold=self.repeat_threshold)
+        return False
+
+
+def enforce(app, budgets, default=None, allow_duplicates=False, repeat_threshold=REPEAT_THRESHOLD):
+    """Check every request against budgets[endpoint]; over-budget requests raise."""
+    _listen()
+    app.extensions['query_budgets'] = budgets
+
+    @app.before_request
+    def start_recording():
+        g.query_budget = Recorder()
+
+    @app.after_request
+    def check_budget(response):
+        recorder = g.pop('query_budget', None)
+        if recorder is not None:
+            recorder.check(budgets.get(request.endpoint, default), label=f'{request.method} {request.path}',
+                           allow_duplicates=allow_duplicates, repeat_threshold=repeat_threshold)
+        return response
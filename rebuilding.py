@@ -0,0 +1,68 @@
+import threading
+import time
+
+from flask import current_app
+
+import versions
+from models import db
+
+# Lifecycle shared by the per-process indexes over the jobs table
+# (recommend, suggest). An index is built on first use, or when the
+# database URL changes, and caught up with new jobs whenever the jobs data
+# version moves. Every `rebuild_seconds` it is rebuilt from scratch in a
+# background thread, so edits and deletions are reflected too; requests
+# keep using the old index meanwhile and the new one is swapped in under
+# the lock. The jobs version is read before the rebuild loads anything, so
+# jobs committed during it show up as a version change and are caught up
+# after the swap.
+#
+# Indexes must have `url`, `jobs_version` and `built_at` attributes.
+
+
+class RebuildingIndex:
+    def __init__(self, name, build, catch_up, rebuild_seconds, on_replace=None):
+        self.name = name
+        self.build = build  # (url, jobs_version) -> index
+        self.catch_up = catch_up  # (index) -> None
+        self.rebuild_seconds = rebuild_seconds
+        self.on_replace = on_replace
+        self.current = None
+        self.lock = threading.Lock()
+        self.rebuilding = False
+
+    def get(self):
+        with self.lock:
+            version = versions.get('jobs')
+            url = str(db.engine.url)
+            if self.current is None or self.current.url != url:
+                self._replace(self.build(url, version))
+                return self.current
+            if time.monotonic() - self.current.built_at > self.rebuild_seconds and not self.rebuilding:
+                self.rebuilding = True
+                threading.Thread(target=self._rebuild, args=(current_app._get_current_object(), url),
+                                 name=f'{self.name}-rebuild', daemon=True).start()
+            if self.current.jobs_version != version:
+                self.current.jobs_version = version
+                self.catch_up(self.current)
+            return self.current
+
+    def _replace(self, index):
+        self.current = index
+        if self.on_replace is not None:
+            self.on_replace()
+
+    def _rebuild(self, app, url):
+        try:
+            with app.app_context():
+                try:
+                    index = self.build(url, versions.get('jobs'))
+                finally:
+                    db.session.remove()
+            with self.lock:
+                if self.current is not None and self.current.url == url:
+                    self._replace(index)
+        except Exception:
+            app.logger.exception('%s index rebuild failed', self.name)
+        finally:
+            with self.lock:
+                self.rebuilding = False
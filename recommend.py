@@ -0,0 +1,188 @@
+import math
+import re
+import threading
+import time
+
+from sqlalchemy import select
+
+from cache import TTLCache
+from models import db, Job
+from rebuilding import RebuildingIndex
+
+# Skill-based job recommendations. Job titles and descriptions are tokenized
+# into a vocabulary, with an inverted index from term to the jobs containing
+# it. A job seeker's free-text skills are scored against it with TF-IDF
+# cosine similarity, one vectorized NumPy pass per query term, so a query
+# only touches the postings of the user's own skills.
+#
+# The index lives in each worker process. It is built on first use, picks up
+# new jobs incrementally (create_job in this process directly, other writers
+# through the shared jobs data version) and is rebuilt from scratch every
+# REBUILD_SECONDS so edits and deletions are eventually reflected too (see
+# rebuilding.py).
+
+REBUILD_SECONDS = 600
+_TOKEN = re.compile(r'[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]')
+STOPWORDS = frozenset('''
+a an and are as at be by for from in into is it of on or our the to we with you your will
+using use build design work working across new team teams strong experience years
+'''.split())
+
+
+def tokenize(text):
+    return [token for token in _TOKEN.findall((text or '').lower()) if token not in STOPWORDS]
+
+
+class SkillIndex:
+    def __init__(self):
+        self.vocabulary = {}
+        self.job_ids = []
+        self._positions = {}
+        self._postings = []
+        self._arrays = {}
+        self._norms = []
+        self._norm_array = None
+        self.max_job_id = 0
+        self.url = None
+        self.jobs_version = None
+        self.built_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    def _idf(self, term_id):
+        return math.log((len(self.job_ids) + 1) / (len(self._postings[term_id][0]) + 1)) + 1
+
+    def add(self, job_id, text):
+        counts = {}
+        for token in tokenize(text):
+            counts[token] = counts.get(token, 0) + 1
+        with self._lock:
+            if job_id in self._positions:
+                return
+            position = len(self.job_ids)
+            self._positions[job_id] = position
+            self.job_ids.append(job_id)
+            norm = 0.0
+            for token, count in counts.items():
+                term_id = self.vocabulary.get(token)
+                if term_id is None:
+                    term_id = self.vocabulary[token] = len(self._postings)
+                    self._postings.append(([], []))
+                docs, weights = self._postings[term_id]
+                docs.append(position)
+                weights.append(1 + math.log(count))
+                self._arrays.pop(term_id, None)
+                norm += (weights[-1] * self._idf(term_id)) ** 2
+            # Norms use the IDF at insert time; finalize() after a full build
+            # recomputes them, and the periodic rebuild evens out the drift
+            # from incremental adds.
+            self._norms.append(math.sqrt(norm) or 1.0)
+            self._norm_array = None
+
+    def finalize(self):
+        import numpy as np
+        with self._lock:
+            norms = np.zeros(len(self.job_ids), dtype=np.float64)
+            for term_id in range(len(self._postings)):
+                docs, weights = self._term_arrays(term_id)
+                norms[docs] += (weights * self._idf(term_id)) ** 2
+            norms = np.sqrt(norms)
+            norms[norms == 0] = 1.0
+            self._norms = norms.tolist()
+            self._norm_array = None
+
+    def query_vector(self, text):
+        counts = {}
+        for token in tokenize(text):
+            term_id = self.vocabulary.get(token)
+            if term_id is not None:
+                counts[term_id] = counts.get(term_id, 0) + 1
+        return [(term_id, 1 + math.log(count)) for term_id, count in counts.items()]
+
+    def _term_arrays(self, term_id):
+        import numpy as np
+        arrays = self._arrays.get(term_id)
+        if arrays is None:
+            docs, weights = self._postings[term_id]
+            arrays = self._arrays[term_id] = (np.asarray(docs, dtype=np.int64), np.asarray(weights, dtype=np.float32))
+        return arrays
+
+    def top(self, vector, k=10, exclude=()):
+        """Return [(job_id, score)] for the k jobs closest to `vector`."""
+        import numpy as np
+        if not vector or not self.job_ids:
+            return []
+        with self._lock:
+            n = len(self.job_ids)
+            if self._norm_array is None or len(self._norm_array) != n:
+                self._norm_array = np.asarray(self._norms, dtype=np.float32)
+            scores = np.zeros(n, dtype=np.float32)
+            query_norm = 0.0
+            for term_id, weight in vector:
+                idf = self._idf(term_id)
+                docs, doc_weights = self._term_arrays(term_id)
+                scores[docs] += doc_weights * (weight * idf * idf)
+                query_norm += (weight * idf) ** 2
+            scores /= self._norm_array * math.sqrt(query_norm)
+            for job_id in exclude:
+                position = self._positions.get(job_id)
+                if position is not None:
+                    scores[position] = 0
+            k = min(k, n)
+            candidates = np.argpartition(-scores, k - 1)[:k]
+            candidates = candidates[np.argsort(-scores[candidates])]
+            return [(self.job_ids[i], float(scores[i])) for i in candidates if scores[i] > 0]
+
+
+_user_vectors = TTLCache(maxsize=4096, ttl=600)
+
+
+def _load(index, after_id=0):
+    statement = (select(Job.id, Job.title, Job.description)
+                 .where(Job.id > after_id).order_by(Job.id)
+                 .execution_options(yield_per=2000))
+    for job_id, title, description in db.session.execute(statement):
+        # add() skips jobs create_job already indexed in this process.
+        index.add(job_id, f'{title} {description}')
+        index.max_job_id = job_id
+
+
+def _build(url, version):
+    index = SkillIndex()
+    index.url = url
+    index.jobs_version = version
+    _load(index)
+    index.finalize()
+    return index
+
+
+_index = RebuildingIndex('recommend', _build, lambda index: _load(index, after_id=index.max_job_id),
+                         REBUILD_SECONDS, on_replace=_user_vectors.clear)
+
+
+def get_index():
+    """The process-wide index, built or caught up with the jobs table as needed."""
+    return _index.get()
+
+
+def index_job(job_id, title, description):
+    index = _index.current
+    if index is not None:
+        index.add(job_id, f'{title} {description}')
+
+
+def invalidate_user(user_id):
+    _user_vectors.pop(user_id)
+
+
+def recommend(user_id, skills, k=10, exclude=()):
+    index = get_index()
+    # A cached vector is stale once the vocabulary grows: one of the user's
+    # skills may have just appeared in a new job.
+    cached = _user_vectors.get(user_id)
+    if cached is None or cached[0] != len(index.vocabulary):
+        cached = (len(index.vocabulary), index.query_vector(skills))
+        _user_vectors.set(user_id, cached)
+    return index.top(cached[1], k=k, exclude=exclude)
@@ -1,13 +1,17 @@
 from models import db, Job
 from flask import Flask
+from search import ensure_search_index
+import versions
 
 app = Flask(__name__)
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///jobs.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 db.init_app(app)
+versions.init_app(app)
 
 with app.app_context():
+    ensure_search_index()
     Job.query.delete()
     
     jobs = [
@@ -22,6 +26,7 @@ with app.app_context():
     
     db.session.add_all(jobs)
     db.session.commit()
+    versions.bump('jobs')
     
     print("Reset to 7 unique jobs:")
     for job in Job.query.all():
@@ -1,16 +1,41 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt, create_access_token
+import io
+
+from flask import Blueprint, current_app, request, jsonify, abort
+from flask_jwt_extended import jwt_required, create_access_token
+from sqlalchemy import select
 from models import db, Job, User, Application, Interview
-from sqlalchemy import or_
+from search import apply_search
+from pagination import keyset_page, ordering, InvalidCursor
+from counts import COUNT_MODES, count_jobs, filter_key, page_count
+from identity import current_identity, current_user, invalidate_user
+import applying
+import batch
+import cache
+import events
+import exports
+import facets
+import ingest
+import recommend
+import suggest
+import tags
+import tasks
+import versions
+from serializers import (
+    JOB, APPLICATION, INTERVIEW, requested_fields, JOB_LIST_FIELDS, JOB_DETAIL_FIELDS,
+    EMPLOYER_APPLICATION_FIELDS, SEEKER_APPLICATION_FIELDS, TRACKER_APPLICATION_FIELDS, SEEKER_INTERVIEW_FIELDS
+)
 
 jobs_bp = Blueprint('jobs', __name__)
 auth_bp = Blueprint('auth', __name__)
 applications_bp = Blueprint('applications', __name__)
 
+SORTS = ('relevance', 'newest', 'salary', '-salary')
+# Deeper than this, OFFSET paging is the wrong tool; use ?cursor=.
+MAX_PAGE = 10000
+
 
 def get_current_user():
-    username = get_jwt_identity()
-    return User.query.filter_by(username=username).first()
+    return db.session.get(User, current_identity().id)
 
 @auth_bp.route('/register', methods=['POST'])
 @auth_bp.route('/api/register', methods=['POST'])
@@ -73,6 +98,10 @@ def login():
     if not user or not user.check_password(password):
         return jsonify({'error': 'Invalid email or password'}), 401
     
+    if user.needs_rehash():
+        user.set_password(password)
+        db.session.commit()
+    
     access_token = create_access_token(identity=user.username, additional_claims={'role': user.role, 'user_id': user.id})
     return jsonify({
         'access_token': access_token, 
@@ -92,82 +121,184 @@ def login():
 def get_jobs_jobseekers():
     return get_jobs()
 
+
+def submit_applications(user_id, job_ids, key):
+    submissions = applying.apply(user_id, job_ids, key)
+    if any(s.outcome == applying.APPLIED and not s.replayed for s in submissions):
+        versions.bump('applications')
+    return submissions
+
+
+def apply_response(submission, already_applied):
+    if submission.outcome == applying.APPLIED:
+        response = jsonify({'message': 'Applied!'}), 201
+    elif submission.outcome == applying.NOT_FOUND:
+        response = jsonify({'error': 'Job not found'}), 404
+    else:
+        response = jsonify({'error': already_applied}), 400
+    if submission.replayed:
+        response += ({'Idempotent-Replayed': 'true'},)
+    return response
+
 @jobs_bp.route('/jobseekers/jobs/<int:job_id>/apply', methods=['POST'])
 @jwt_required()
 def apply_job_jobseekers(job_id):
-    user = get_current_user()
+    user = current_identity()
     if user.role != 'job_seeker':
         return jsonify({'error': 'Access denied'}), 403
+    try:
+        key = applying.parse_key(request.headers.get('Idempotency-Key'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    existing = Application.query.filter_by(job_id=job_id, user_id=user.id).first()
-    if existing:
-        return jsonify({'error': 'Already applied to this job'}), 400
+    submission, = submit_applications(user.id, [job_id], key)
+    return apply_response(submission, 'Already applied to this job')
+
+@jobs_bp.route('/jobseekers/jobs/apply', methods=['POST'])
+@jwt_required()
+def bulk_apply_jobseekers():
+    user = current_identity()
+    if user.role != 'job_seeker':
+        return jsonify({'error': 'Access denied'}), 403
     
-    application = Application(job_id=job_id, user_id=user.id)
-    db.session.add(application)
-    db.session.commit()
-    return jsonify({'message': 'Applied!'}), 201
+    job_ids = (request.get_json(silent=True) or {}).get('job_ids')
+    if (not isinstance(job_ids, list) or not 0 < len(job_ids) <= applying.MAX_BULK
+            or not all(type(job_id) is int for job_id in job_ids)):
+        return jsonify({'error': f'job_ids must be a list of 1 to {applying.MAX_BULK} job ids'}), 400
+    try:
+        key = applying.parse_key(request.headers.get('Idempotency-Key'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    submissions = submit_applications(user.id, list(dict.fromkeys(job_ids)), key)
+    results = [{'job_id': s.job_id, 'status': s.outcome} for s in submissions]
+    applied = sum(s.outcome == applying.APPLIED for s in submissions)
+    return jsonify({'applied': applied, 'results': results}), 201 if applied else 200
 
 
 @jobs_bp.route('/jobs', methods=['GET'])
 @jobs_bp.route('/api/jobs', methods=['GET'])
+@versions.conditional('jobs')
+@cache.cached_response('jobs')
 def get_jobs():
     search = request.args.get('search', '')
     location = request.args.get('location', '')
     job_type = request.args.get('job_type', '')
-    page = int(request.args.get('page', 1))
-    per_page = min(int(request.args.get('per_page', 6)), 50)
+    tag_names = tags.parse_tags(request.args.get('tags', ''))
+    match = request.args.get('match', 'all')
+    if match not in tags.MATCH_MODES:
+        return jsonify({'error': 'Invalid match mode'}), 400
+    try:
+        facet_names = facets.parse(request.args.get('facets', ''))
+        min_salary, max_salary = (float(request.args[name]) if request.args.get(name) else None
+                                  for name in ('min_salary', 'max_salary'))
+        salary_bucket = int(request.args.get('salary_bucket', facets.SALARY_BUCKET))
+    except ValueError:
+        return jsonify({'error': 'Invalid facets or salary filter'}), 400
+    if not facets.MIN_SALARY_BUCKET <= salary_bucket <= facets.MAX_SALARY_BUCKET:
+        return jsonify({'error': f'salary_bucket must be between {facets.MIN_SALARY_BUCKET} '
+                                 f'and {facets.MAX_SALARY_BUCKET}'}), 400
+    sort = request.args.get('sort', 'relevance')
+    if sort not in SORTS:
+        return jsonify({'error': 'Invalid sort'}), 400
+    try:
+        page = max(int(request.args.get('page', 1)), 1)
+        per_page = max(1, min(int(request.args.get('per_page', request.args.get('limit', 6))), 50))
+    except ValueError:
+        return jsonify({'error': 'Invalid page or limit'}), 400
+    if page > MAX_PAGE:
+        return jsonify({'error': f'page must be at most {MAX_PAGE}; use cursor paging'}), 400
     
     query = Job.query
     
-    if search:
-        query = query.filter(or_(Job.title.ilike(f'%{search}%'), Job.description.ilike(f'%{search}%')))
+    query, rank = apply_search(query, search)
     if location:
         query = query.filter(Job.location.ilike(f'%{location}%'))
     if job_type:
         query = query.filter(Job.job_type == job_type)
+    if tag_names:
+        query = tags.filter_by_tags(query, tag_names, match)
+    if min_salary is not None:
+        query = query.filter(Job.salary >= min_salary)
+    if max_salary is not None:
+        query = query.filter(Job.salary <= max_salary)
+    
+    if sort == 'salary':
+        keys = [(Job.salary, False), (Job.id, False)]
+    elif sort == '-salary':
+        keys = [(Job.salary, True), (Job.id, True)]
+    elif sort == 'newest':
+        keys = [(Job.id, True)]
+    else:
+        keys = [(Job.id, False)]
+        if rank is not None:
+            keys.insert(0, (rank, False))
+    
+    columns, render = JOB.compile(requested_fields(request.args, JOB_LIST_FIELDS))
+    rows = query.with_entities(*columns)
+    
+    cursor_mode = 'cursor' in request.args
+    count = request.args.get('count', 'none' if cursor_mode else 'exact')
+    if count not in COUNT_MODES:
+        return jsonify({'error': 'Invalid count mode'}), 400
+    
+    if cursor_mode:
+        try:
+            items, next_cursor = keyset_page(rows, keys, request.args.get('cursor'), per_page)
+        except InvalidCursor:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        body = {'limit': per_page, 'next_cursor': next_cursor, 'has_next': next_cursor is not None}
+    else:
+        items = rows.order_by(*ordering(keys)).offset((page - 1) * per_page).limit(per_page + 1).all()
+        has_next = len(items) > per_page
+        items = items[:per_page]
+        body = {
+            'page': page,
+            'per_page': per_page,
+            'has_next': has_next
+        }
     
-    paginated = query.paginate(page=page, per_page=per_page, error_out=False)
-    
-    response = jsonify({
-        'jobs': [{
-            'id': job.id,
-            'title': job.title,
-            'description': job.description,
-            'location': job.location,
-            'salary': job.salary,
-            'salary_range': f'${job.salary:,.0f}',
-            'job_type': job.job_type,
-            'employer_id': job.employer_id,
-            'employer_name': ['Microsoft', 'Google', 'Apple', 'Netflix', 'Meta'][(job.employer_id - 1) % 5],
-            'created_at': '2024-01-01T00:00:00'
-        } for job in paginated.items],
-        'total': paginated.total,
-        'page': page,
-        'per_page': per_page,
-        'pages': paginated.pages
-    })
-    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-    return response
+    if count != 'none' or not cursor_mode:
+        total, estimated = count_jobs(query, filter_key(
+            search, location, job_type, ','.join(sorted(tag_names)), match if tag_names else '',
+            request.args.get('min_salary', ''), request.args.get('max_salary', '')), count)
+        body['total'] = total
+        body['total_estimated'] = estimated
+        if not cursor_mode:
+            body['pages'] = page_count(total, per_page)
+    if facet_names:
+        body['facets'] = facets.facets(query, facet_names, bucket=salary_bucket)
+    
+    body['jobs'] = [render(row) for row in items]
+    return jsonify(body)
+
+@jobs_bp.route('/jobs/suggest', methods=['GET'])
+def suggest_jobs():
+    field = request.args.get('field', 'title')
+    if field not in suggest.FIELDS:
+        return jsonify({'error': 'Invalid field'}), 400
+    limit = max(min(request.args.get('limit', 8, type=int), suggest.MAX_LIMIT), 1)
+    
+    suggestions = suggest.suggest(field, request.args.get('q', ''), limit)
+    return jsonify({'field': field, 'suggestions': [{'value': value, 'count': count} for value, count in suggestions]})
 
 @jobs_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@versions.conditional('jobs')
+@cache.cached_response(lambda job_id: f'job:{job_id}')
 def get_job_details(job_id):
-    job = Job.query.get_or_404(job_id)
-    return jsonify({
-        'id': job.id,
-        'title': job.title,
-        'description': job.description,
-        'location': job.location,
-        'salary': job.salary,
-        'job_type': job.job_type,
-        'employer_id': job.employer_id
-    })
+    columns, render = JOB.compile(requested_fields(request.args, JOB_DETAIL_FIELDS))
+    row = db.session.query(*columns).filter(Job.id == job_id).first()
+    if row is None:
+        abort(404)
+    return jsonify(render(row))
 
 @jobs_bp.route('/jobs', methods=['POST'])
 @jwt_required()
 def create_job():
     data = request.get_json()
-    user = get_current_user()
+    user = current_identity()
     
     job = Job(
         title=data.get('title'),
@@ -179,56 +310,73 @@ def create_job():
     )
     
     db.session.add(job)
+    db.session.flush()
+    tag_names = tags.parse_tags(data.get('tags'))
+    if tag_names:
+        tags.set_job_tags(job.id, tag_names)
+    job_id = job.id
+    tasks.enqueue('index_job', {'job_id': job_id, 'infer_tags': not tag_names}, key=f'index_job:{job_id}')
     db.session.commit()
+    versions.bump('jobs')
     
-    return jsonify({'message': 'Job posted successfully!', 'job_id': job.id}), 201
+    return jsonify({'message': 'Job posted successfully!', 'job_id': job_id}), 201
+
+@jobs_bp.route('/jobs/bulk', methods=['POST'])
+@jwt_required()
+def bulk_create_jobs():
+    user = current_identity()
+    if user.role != 'employer':
+        return jsonify({'error': 'Access denied'}), 403
+    
+    fmt = 'csv' if request.mimetype == 'text/csv' else 'ndjson'
+    stream = ingest.open_text(io.BufferedReader(request.stream))
+    report = ingest.ingest(ingest.reader_for(fmt, stream), employer_id=user.id)
+    
+    if report['inserted']:
+        return jsonify(report), 201
+    return jsonify(report), 400 if report['failed'] else 200
 
 @jobs_bp.route('/employer/jobs', methods=['GET'])
+@versions.conditional('jobs')
 def get_employer_jobs():
     employer_id = 1
-    jobs = Job.query.filter_by(employer_id=employer_id).all()
-    
-    result = []
-    for job in jobs:
-        result.append({
-            'id': job.id,
-            'title': job.title,
-            'description': job.description,
-            'location': job.location,
-            'salary': job.salary,
-            'salary_range': f'${job.salary:,.0f}',
-            'job_type': job.job_type,
-            'employer_id': job.employer_id,
-            'employer_name': ['Microsoft', 'Google', 'Apple', 'Netflix', 'Meta'][(job.employer_id - 1) % 5],
-            'created_at': '2024-01-01T00:00:00'
-        })
-    
-    return jsonify(result), 200
+    columns, render = JOB.compile(requested_fields(request.args, JOB_LIST_FIELDS))
+    jobs = db.session.query(*columns).filter(Job.employer_id == employer_id).order_by(Job.id).all()
+    
+    return jsonify([render(row) for row in jobs]), 200
 
 @jobs_bp.route('/employer/applications', methods=['GET'])
+@versions.conditional('applications', 'jobs')
 def get_employer_applications():
     employer_id = 1
-    applications = db.session.query(Application, Job).join(Job, Application.job_id == Job.id).filter(Job.employer_id == employer_id).order_by(Application.id.desc()).all()
-    
-    result = []
-    for app, job in applications:
-        result.append({
-            'id': app.id,
-            'status': app.status,
-            'job_id': job.id,
-            'applicant_name': 'Job Seeker',
-            'applicant_email': 'jobseeker@example.com',
-            'job': {
-                'id': job.id,
-                'title': job.title,
-                'location': job.location,
-                'job_type': job.job_type,
-                'salary': job.salary,
-                'salary_range': f'${job.salary:,.0f}'
-            }
-        })
+    columns, render = APPLICATION.compile(requested_fields(request.args, EMPLOYER_APPLICATION_FIELDS))
+    applications = db.session.query(*columns).select_from(Application).join(Job, Application.job_id == Job.id).filter(Job.employer_id == employer_id).order_by(Application.id.desc()).all()
     
-    return jsonify(result), 200
+    return jsonify([render(row) for row in applications]), 200
+
+@jobs_bp.route('/employer/jobs/export', methods=['GET'])
+def export_employer_jobs():
+    employer_id = 1
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in exports.FORMATS:
+        return jsonify({'error': 'Invalid format'}), 400
+    
+    fields = requested_fields(request.args, JOB_LIST_FIELDS)
+    columns, render = JOB.compile(fields)
+    statement = select(*columns).where(Job.employer_id == employer_id).order_by(Job.id)
+    return exports.stream(statement, render, fields, fmt, 'jobs')
+
+@jobs_bp.route('/employer/applications/export', methods=['GET'])
+def export_employer_applications():
+    employer_id = 1
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in exports.FORMATS:
+        return jsonify({'error': 'Invalid format'}), 400
+    
+    fields = requested_fields(request.args, EMPLOYER_APPLICATION_FIELDS)
+    columns, render = APPLICATION.compile(fields)
+    statement = select(*columns).select_from(Application).join(Job, Application.job_id == Job.id).where(Job.employer_id == employer_id).order_by(Application.id.desc())
+    return exports.stream(statement, render, fields, fmt, 'applications')
 
 @jobs_bp.route('/applications/<int:app_id>/status', methods=['PUT'])
 def update_application_status(app_id):
@@ -240,7 +388,13 @@ def update_application_status(app_id):
     
     application = Application.query.get_or_404(app_id)
     application.status = status
+    tasks.enqueue('notify_user', {
+        'user_id': application.user_id,
+        'event': 'application',
+        'data': {'id': app_id, 'job_id': application.job_id, 'status': status}
+    })
     db.session.commit()
+    versions.bump('applications')
     
     return jsonify({'message': f'Application {status}'}), 200
 
@@ -256,33 +410,34 @@ def schedule_interview():
         notes=data.get('notes', '')
     )
     
+    payload = {
+        'application_id': interview.application_id,
+        'date': interview.date,
+        'time': interview.time,
+        'location': interview.location
+    }
     db.session.add(interview)
+    db.session.flush()
+    
+    payload['id'] = interview.id
+    user_id = db.session.query(Application.user_id).filter_by(id=payload['application_id']).scalar()
+    if user_id is not None:
+        tasks.enqueue('notify_user', {'user_id': user_id, 'event': 'interview', 'data': payload},
+                      key=f'interview:{interview.id}')
     db.session.commit()
+    versions.bump('interviews')
     
     return jsonify({'message': 'Interview scheduled!'}), 201
 
 @jobs_bp.route('/interviews/jobseeker', methods=['GET'])
 @jwt_required()
+@versions.conditional('interviews', 'applications', 'jobs')
 def get_jobseeker_interviews():
-    user = get_current_user()
-    interviews = db.session.query(Interview, Application, Job).join(Application, Interview.application_id == Application.id).join(Job, Application.job_id == Job.id).filter(Application.user_id == user.id).all()
-    
-    result = []
-    for interview, app, job in interviews:
-        result.append({
-            'id': interview.id,
-            'date': interview.date,
-            'time': interview.time,
-            'location': interview.location,
-            'notes': interview.notes,
-            'job': {
-                'title': job.title,
-                'location': job.location,
-                'employer_name': ['Microsoft', 'Google', 'Apple', 'Netflix', 'Meta'][(job.employer_id - 1) % 5]
-            }
-        })
+    user = current_identity()
+    columns, render = INTERVIEW.compile(requested_fields(request.args, SEEKER_INTERVIEW_FIELDS))
+    interviews = db.session.query(*columns).select_from(Interview).join(Application, Interview.application_id == Application.id).join(Job, Application.job_id == Job.id).filter(Application.user_id == user.id).all()
     
-    return jsonify(result), 200
+    return jsonify([render(row) for row in interviews]), 200
 
 
 @applications_bp.route('/', methods=['POST'])
@@ -291,49 +446,61 @@ def apply_for_job():
     data = request.get_json()
     job_id = data.get('job_id')
     user_id = 15
+    if type(job_id) is not int:
+        return jsonify({'error': 'job_id is required'}), 400
+    try:
+        key = applying.parse_key(request.headers.get('Idempotency-Key'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    existing = Application.query.filter_by(job_id=job_id, user_id=user_id).first()
-    if existing:
-        return jsonify({'error': 'Already applied'}), 400
-    
-    application = Application(job_id=job_id, user_id=user_id)
-    db.session.add(application)
-    db.session.commit()
-    return jsonify({'message': 'Applied!'}), 201
+    submission, = submit_applications(user_id, [job_id], key)
+    return apply_response(submission, 'Already applied')
 
 @applications_bp.route('/applications/my-applications', methods=['GET'])
 @jwt_required()
+@versions.conditional('applications', 'jobs')
 def get_my_applications():
-    user = get_current_user()
+    user = current_identity()
     if user.role != 'job_seeker':
         return jsonify({'error': 'Access denied'}), 403
     
-    applications = db.session.query(Application, Job).join(Job, Application.job_id == Job.id).filter(Application.user_id == user.id).all()
-    
-    result = []
-    for app, job in applications:
-        result.append({
-            'id': app.id,
-            'status': app.status,
-            'job': {
-                'id': job.id,
-                'title': job.title,
-                'location': job.location,
-                'job_type': job.job_type,
-                'salary': job.salary
-            }
-        })
+    columns, render = APPLICATION.compile(requested_fields(request.args, TRACKER_APPLICATION_FIELDS))
+    applications = db.session.query(*columns).select_from(Application).join(Job, Application.job_id == Job.id).filter(Application.user_id == user.id).all()
     
-    return jsonify(result), 200
+    return jsonify([render(row) for row in applications]), 200
 
 
 
 
+@jobs_bp.route('/jobseekers/recommendations', methods=['GET'])
+@jwt_required()
+def get_recommendations():
+    user = current_user()
+    if user.role != 'job_seeker':
+        return jsonify({'error': 'Access denied'}), 403
+    
+    limit = max(min(request.args.get('limit', 10, type=int), 50), 1)
+    applied = db.session.scalars(select(Application.job_id).where(Application.user_id == user.id)).all()
+    scored = recommend.recommend(user.id, user.skills, k=limit, exclude=applied)
+    if not scored:
+        return jsonify({'jobs': []}), 200
+    
+    scores = dict(scored)
+    columns, render = JOB.compile(requested_fields(request.args, JOB_LIST_FIELDS))
+    rows = db.session.query(Job.id, *columns).filter(Job.id.in_(scores)).all()
+    jobs = []
+    for row in sorted(rows, key=lambda row: -scores[row[0]]):
+        job = render(row[1:])
+        job['score'] = round(scores[row[0]], 4)
+        jobs.append(job)
+    
+    return jsonify({'jobs': jobs}), 200
+
 @jobs_bp.route('/profile', methods=['GET'])
 @jobs_bp.route('/jobseekers/me', methods=['GET'])
 @jwt_required()
 def get_profile():
-    user = get_current_user()
+    user = current_user()
     return jsonify({
         'id': user.id,
         'username': user.username,
@@ -359,35 +526,24 @@ def update_profile():
     user.skills = data.get('skills', user.skills)
     user.experience = data.get('experience', user.experience)
     user.resume_url = data.get('resume_url', user.resume_url)
+    if 'skills' in data:
+        tasks.enqueue('refresh_user_tags', {'user_id': user.id})
     
     db.session.commit()
+    invalidate_user(current_identity().id)
+    recommend.invalidate_user(current_identity().id)
+    versions.bump('users')
     return jsonify({'message': 'Profile updated'}), 200
 
 
 @jobs_bp.route('/applications/', methods=['GET'])
+@versions.conditional('applications', 'jobs')
 def get_applications():
     user_id = 15
-    applications = db.session.query(Application, Job).join(Job, Application.job_id == Job.id).filter(Application.user_id == user_id).order_by(Application.id.desc()).all()
-    
-    result = []
-    for app, job in applications:
-        result.append({
-            'id': app.id,
-            'status': app.status,
-            'job_id': job.id,
-            'job': {
-                'id': job.id,
-                'title': job.title,
-                'location': job.location,
-                'job_type': job.job_type,
-                'salary': job.salary,
-                'salary_range': f'${job.salary:,.0f}',
-                'description': job.description,
-                'employer_name': ['Microsoft', 'Google', 'Apple', 'Netflix', 'Meta'][(job.employer_id - 1) % 5]
-            }
-        })
+    columns, render = APPLICATION.compile(requested_fields(request.args, SEEKER_APPLICATION_FIELDS))
+    applications = db.session.query(*columns).select_from(Application).join(Job, Application.job_id == Job.id).filter(Application.user_id == user_id).order_by(Application.id.desc()).all()
     
-    return jsonify(result), 200
+    return jsonify([render(row) for row in applications]), 200
 
 @jobs_bp.route('/applications/<int:job_id>', methods=['DELETE'])
 def remove_application(job_id):
@@ -398,6 +554,29 @@ def remove_application(job_id):
     
     db.session.delete(application)
     db.session.commit()
+    versions.bump('applications')
     return jsonify({'message': 'Removed'}), 200
 
 
+@jobs_bp.route('/events', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def event_stream():
+    # Deployments serve /events from create_events_app on gevent instead.
+    if not current_app.config['SERVE_EVENTS']:
+        abort(404)
+    return events.response(current_identity().id)
+
+
+@jobs_bp.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    response_cache = cache.response_cache()
+    return jsonify(response_cache.stats() if response_cache else {}), 200
+
+
+@jobs_bp.route('/batch', methods=['POST'])
+def run_batch():
+    try:
+        items = batch.parse(request.get_json(silent=True))
+    except batch.InvalidBatch as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'responses': batch.run(items)}), 200
@@ -0,0 +1,45 @@
+from sqlalchemy import text
+
+from models import db
+from search import ensure_search_index
+import tags
+
+# Brings an existing database up to the indexes declared in models.py.
+# Safe to run repeatedly, on SQLite and Postgres alike: every index is
+# created with checkfirst, and duplicates that would violate the unique
+# (job_id, user_id) index are merged first. User tags are re-derived from
+# skills and untagged jobs are tagged from their text.
+
+_MERGE_DUPLICATE_APPLICATIONS = [
+    """
+    UPDATE interview SET application_id = (
+        SELECT MIN(keep.id) FROM application AS dup
+        JOIN application AS keep ON keep.job_id = dup.job_id AND keep.user_id = dup.user_id
+        WHERE dup.id = interview.application_id
+    )
+    WHERE application_id NOT IN (SELECT MIN(id) FROM application GROUP BY job_id, user_id)
+    """,
+    "DELETE FROM application WHERE id NOT IN (SELECT MIN(id) FROM application GROUP BY job_id, user_id)",
+]
+
+
+def upgrade():
+    db.create_all()
+    with db.engine.begin() as conn:
+        for statement in _MERGE_DUPLICATE_APPLICATIONS:
+            conn.execute(text(statement))
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+            print(f'- {index.name} on {table.name}')
+    ensure_search_index()
+    print(f'- tagged {tags.backfill()} jobs')
+
+
+if __name__ == '__main__':
+    from app import create_app
+    app = create_app()
+
+    with app.app_context():
+        upgrade()
+        print('Schema is up to date.')
@@ -0,0 +1,99 @@
+import re
+
+from sqlalchemy import or_, select, table, literal_column, text, func
+from models import db, Job
+
+# SQLite keeps an external-content FTS5 table next to `job`, synced by triggers.
+# pysqlite autocommits DDL statement by statement, so two workers can both
+# see it missing and both run the setup; every statement is IF NOT EXISTS.
+# Postgres gets an expression GIN index; the query below must use the same
+# expression so the planner can pick it up.
+PG_DOCUMENT = "to_tsvector('english', job.title || ' ' || job.description)"
+
+_SQLITE_SETUP = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS job_fts USING fts5("
+    "title, description, content='job', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS job_fts_ai AFTER INSERT ON job BEGIN "
+    "INSERT INTO job_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS job_fts_ad AFTER DELETE ON job BEGIN "
+    "INSERT INTO job_fts(job_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS job_fts_au AFTER UPDATE OF title, description ON job BEGIN "
+    "INSERT INTO job_fts(job_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO job_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "INSERT INTO job_fts(job_fts) VALUES ('rebuild')",
+]
+
+_PG_SETUP = [
+    f"CREATE INDEX IF NOT EXISTS ix_job_search ON job USING GIN ({PG_DOCUMENT.replace('job.', '')})",
+]
+
+_ready = set()
+
+
+def _dialect():
+    return db.engine.dialect.name
+
+
+def ensure_search_index():
+    """Create the full-text index for the current engine if it is missing."""
+    url = str(db.engine.url)
+    if url in _ready:
+        return
+    dialect = _dialect()
+    with db.engine.begin() as conn:
+        if dialect == 'sqlite':
+            exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'job_fts'")).first()
+            if not exists:
+                for statement in _SQLITE_SETUP:
+                    conn.execute(text(statement))
+        elif dialect == 'postgresql':
+            for statement in _PG_SETUP:
+                conn.execute(text(statement))
+    _ready.add(url)
+
+
+def rebuild_search_index():
+    """Re-sync the index from the job table, e.g. after loaders bypassed triggers."""
+    ensure_search_index()
+    if _dialect() == 'sqlite':
+        with db.engine.begin() as conn:
+            conn.execute(text("INSERT INTO job_fts(job_fts) VALUES ('rebuild')"))
+
+
+def _terms(search):
+    return re.findall(r'\w+', search.lower())
+
+
+def apply_search(query, search):
+    """Filter a Job query by `search`, returning (query, rank) where lower rank is a better match.
+
+    Every word must match; the last word is also matched as a prefix so the
+    box can search as the user types.
+    """
+    terms = _terms(search)
+    if not terms:
+        return query, None
+
+    dialect = _dialect()
+    if dialect == 'sqlite':
+        ensure_search_index()
+        match = ' '.join(f'"{term}"' for term in terms) + '*'
+        matches = (
+            select(literal_column('rowid').label('job_id'), literal_column('bm25(job_fts)').label('rank'))
+            .select_from(table('job_fts'))
+            .where(text('job_fts MATCH :match').bindparams(match=match))
+            .subquery()
+        )
+        return query.join(matches, matches.c.job_id == Job.id), matches.c.rank
+
+    if dialect == 'postgresql':
+        ensure_search_index()
+        tsquery = ' & '.join(terms[:-1] + [f'{terms[-1]}:*'])
+        document = literal_column(PG_DOCUMENT)
+        ts_query = func.to_tsquery('english', tsquery)
+        rank = -func.ts_rank(document, ts_query)
+        return query.filter(document.op('@@')(ts_query)), rank
+
+    for term in terms:
+        query = query.filter(or_(Job.title.ilike(f'%{term}%'), Job.description.ilike(f'%{term}%')))
+    return query, None
@@ -0,0 +1,168 @@
+from flask.json.provider import DefaultJSONProvider
+
+from models import Job, Application, Interview
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+EMPLOYER_NAMES = ('Microsoft', 'Google', 'Apple', 'Netflix', 'Meta')
+CREATED_AT = '2024-01-01T00:00:00'
+
+
+def employer_name(employer_id):
+    return EMPLOYER_NAMES[(employer_id - 1) % len(EMPLOYER_NAMES)]
+
+
+def salary_range(salary):
+    return f'${salary:,.0f}'
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+class Field:
+    """One output key: a column, optionally passed through `compute`, or a constant."""
+
+    def __init__(self, column=None, compute=None, constant=None):
+        self.column = column
+        self.compute = compute
+        self.constant = constant
+
+
+class Schema:
+    def __init__(self, **fields):
+        self.fields = fields
+
+    def compile(self, fields):
+        """Return (columns, render) for a field spec such as ['id', 'job.title'].
+
+        Only the columns the requested fields need are selected, so callers
+        can query with `with_entities(*columns)` and skip ORM hydration;
+        `render` turns each result row into a dict.
+        """
+        columns = []
+        positions = {}
+
+        def position(column):
+            label = f'{column.table.name}_{column.key}'
+            if label not in positions:
+                positions[label] = len(columns)
+                columns.append(column.label(label))
+            return positions[label]
+
+        def build(schema, tree):
+            steps = []
+            for name, subtree in tree.items():
+                field = schema.fields.get(name)
+                if field is None:
+                    raise InvalidFields(name)
+                if isinstance(field, Schema):
+                    steps.append((name, None, build(field, subtree or dict.fromkeys(field.fields))))
+                elif subtree:
+                    raise InvalidFields(name)
+                elif field.column is None:
+                    steps.append((name, None, field.constant))
+                else:
+                    steps.append((name, position(field.column), field.compute))
+            return steps
+
+        steps = build(self, _field_tree(fields))
+        return columns, lambda row: _render(row, steps)
+
+
+def _field_tree(fields):
+    tree = {}
+    for spec in fields:
+        node = tree
+        parts = spec.split('.')
+        for part in parts[:-1]:
+            if node.get(part) is None:
+                node[part] = {}
+            node = node[part]
+        node.setdefault(parts[-1], None)
+    return tree
+
+
+def _render(row, steps):
+    out = {}
+    for name, index, extra in steps:
+        if index is None:
+            out[name] = _render(row, extra) if isinstance(extra, list) else extra
+        elif extra is None:
+            out[name] = row[index]
+        else:
+            out[name] = extra(row[index])
+    return out
+
+
+def requested_fields(args, default):
+    """Fields from ?fields=a,b,job.title, or the endpoint's default shape."""
+    names = [name.strip() for name in (args.get('fields') or '').split(',') if name.strip()]
+    # ?fields=, names nothing; with no columns the query could not run.
+    return names or default
+
+
+JOB = Schema(
+    id=Field(Job.id),
+    title=Field(Job.title),
+    description=Field(Job.description),
+    location=Field(Job.location),
+    salary=Field(Job.salary),
+    salary_range=Field(Job.salary, compute=salary_range),
+    job_type=Field(Job.job_type),
+    employer_id=Field(Job.employer_id),
+    employer_name=Field(Job.employer_id, compute=employer_name),
+    created_at=Field(constant=CREATED_AT),
+)
+
+APPLICATION = Schema(
+    id=Field(Application.id),
+    status=Field(Application.status),
+    job_id=Field(Application.job_id),
+    user_id=Field(Application.user_id),
+    applicant_name=Field(constant='Job Seeker'),
+    applicant_email=Field(constant='jobseeker@example.com'),
+    job=JOB,
+)
+
+INTERVIEW = Schema(
+    id=Field(Interview.id),
+    application_id=Field(Interview.application_id),
+    date=Field(Interview.date),
+    time=Field(Interview.time),
+    location=Field(Interview.location),
+    notes=Field(Interview.notes),
+    job=JOB,
+)
+
+JOB_LIST_FIELDS = ['id', 'title', 'description', 'location', 'salary', 'salary_range',
+                   'job_type', 'employer_id', 'employer_name', 'created_at']
+JOB_DETAIL_FIELDS = ['id', 'title', 'description', 'location', 'salary', 'job_type', 'employer_id']
+EMPLOYER_APPLICATION_FIELDS = ['id', 'status', 'job_id', 'applicant_name', 'applicant_email', 'job.id', 'job.title',
+                               'job.location', 'job.job_type', 'job.salary', 'job.salary_range']
+SEEKER_APPLICATION_FIELDS = ['id', 'status', 'job_id', 'job.id', 'job.title', 'job.location', 'job.job_type',
+                             'job.salary', 'job.salary_range', 'job.description', 'job.employer_name']
+TRACKER_APPLICATION_FIELDS = ['id', 'status', 'job.id', 'job.title', 'job.location', 'job.job_type', 'job.salary']
+SEEKER_INTERVIEW_FIELDS = ['id', 'date', 'time', 'location', 'notes', 'job.title', 'job.location', 'job.employer_name']
+
+
+class JSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that uses orjson when it is installed."""
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=kwargs.get('default', self.default), option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
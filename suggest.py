@@ -0,0 +1,134 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+
+from sqlalchemy import func, select
+
+from models import db, Job
+from rebuilding import RebuildingIndex
+
+# Typeahead suggestions for job titles and locations, served from memory.
+# Each distinct value is filed under every word it contains, in a sorted
+# array searched with bisect, so "eng" finds "Senior Engineer". Results are
+# ranked by how many jobs use the value. Rankings for prefixes with many
+# matches (the first keystrokes) are precomputed and kept up to date as
+# counts grow, so no keystroke has to scan a large range.
+#
+# Like the recommendation index this is per process: built on first use,
+# caught up with new jobs through the jobs data version without querying
+# the database on every keystroke, and rebuilt every REBUILD_SECONDS (see
+# rebuilding.py).
+
+FIELDS = {'title': Job.title, 'location': Job.location}
+MAX_LIMIT = 20
+REBUILD_SECONDS = 600
+_MEMO_THRESHOLD = 256
+
+
+def normalize(text):
+    return ' '.join(text.lower().split())
+
+
+def _keys(value):
+    words = normalize(value).split(' ')
+    return {' '.join(words[i:]) for i in range(len(words))}
+
+
+class PrefixIndex:
+    def __init__(self, counts=None):
+        self.counts = dict(counts or {})
+        self._keys = sorted((key, value) for value in self.counts for key in _keys(value))
+        self._top = {}
+        self._lock = threading.Lock()
+        for prefix in {key[:end] for key, _ in self._keys for end in (0, 1, 2)}:
+            self.suggest(prefix)
+
+    def add(self, value, count=1):
+        value = (value or '').strip()
+        if not value:
+            return
+        with self._lock:
+            known = value in self.counts
+            self.counts[value] = self.counts.get(value, 0) + count
+            for key in _keys(value):
+                if not known:
+                    insort(self._keys, (key, value))
+                for end in range(len(key) + 1):
+                    top = self._top.get(key[:end])
+                    if top is not None:
+                        self._top[key[:end]] = self._promote(top, value)
+
+    def _promote(self, top, value):
+        # Counts only grow, so a value outside a memoized top list can only
+        # enter it, never push out something that should have stayed.
+        top = [item for item in top if item[0] != value] + [(value, self.counts[value])]
+        top.sort(key=lambda item: (-item[1], item[0]))
+        return top[:MAX_LIMIT]
+
+    def suggest(self, prefix, limit=10):
+        prefix = normalize(prefix)
+        with self._lock:
+            top = self._top.get(prefix)
+            if top is None:
+                matches = set()
+                i = bisect_left(self._keys, (prefix,))
+                while i < len(self._keys) and self._keys[i][0].startswith(prefix):
+                    matches.add(self._keys[i][1])
+                    i += 1
+                top = [(value, self.counts[value]) for value in
+                       heapq.nsmallest(MAX_LIMIT, matches, key=lambda value: (-self.counts[value], value))]
+                if len(matches) > _MEMO_THRESHOLD:
+                    self._top[prefix] = top
+            return top[:limit]
+
+
+class Suggester:
+    def __init__(self, url, jobs_version):
+        self.url = url
+        self.jobs_version = jobs_version
+        self.built_at = time.monotonic()
+        self.max_job_id = db.session.scalar(select(func.max(Job.id))) or 0
+        self._added = set()
+        self.indexes = {}
+        for field, column in FIELDS.items():
+            rows = db.session.execute(select(column, func.count()).where(Job.id <= self.max_job_id).group_by(column)).all()
+            self.indexes[field] = PrefixIndex(rows)
+
+    def _add(self, title, location):
+        self.indexes['title'].add(title)
+        self.indexes['location'].add(location)
+
+    def add(self, job_id, title, location):
+        # Jobs added here are remembered so catch_up() doesn't count them twice.
+        if job_id > self.max_job_id and job_id not in self._added:
+            self._added.add(job_id)
+            self._add(title, location)
+
+    def catch_up(self):
+        rows = db.session.execute(
+            select(Job.id, Job.title, Job.location).where(Job.id > self.max_job_id).order_by(Job.id)
+        ).all()
+        for job_id, title, location in rows:
+            if job_id not in self._added:
+                self._add(title, location)
+        if rows:
+            self.max_job_id = rows[-1][0]
+            self._added = {job_id for job_id in self._added if job_id > self.max_job_id}
+
+
+_suggester = RebuildingIndex('suggest', Suggester, Suggester.catch_up, REBUILD_SECONDS)
+
+
+def get_suggester():
+    return _suggester.get()
+
+
+def job_added(job_id, title, location):
+    with _suggester.lock:
+        if _suggester.current is not None:
+            _suggester.current.add(job_id, title, location)
+
+
+def suggest(field, prefix, limit=10):
+    return get_suggester().indexes[field].suggest(prefix, limit)
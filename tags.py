@@ -0,0 +1,110 @@
+from sqlalchemy import delete, func, select
+
+from models import db, Job, User, Tag, job_tags, user_tags, insert_ignore
+from recommend import tokenize
+
+# Normalized skill tags. Users tag themselves through the comma-separated
+# `skills` field; jobs are tagged explicitly on create or, failing that, with
+# every known tag that appears in their title or description. Filtering and
+# facet counts then run on the indexed association tables instead of
+# scanning text.
+
+KNOWN_SKILLS = (
+    'python', 'flask', 'django', 'fastapi', 'java', 'spring', 'kotlin', 'swift', 'go', 'rust',
+    'c++', 'c#', '.net', 'ruby', 'rails', 'php', 'javascript', 'typescript', 'react', 'angular',
+    'vue', 'node.js', 'html', 'css', 'sql', 'postgresql', 'mysql', 'mongodb', 'redis', 'graphql',
+    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform', 'linux', 'git', 'figma',
+    'machine learning', 'data analysis', 'excel', 'tableau', 'project management', 'agile',
+)
+MATCH_MODES = ('all', 'any')
+
+
+def normalize(name):
+    return ' '.join(name.lower().split())[:50]
+
+
+def parse_tags(value):
+    """Accept a list or a comma-separated string; return unique normalized names."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    names = (normalize(name) for name in value if isinstance(name, str))
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def infer_tags(text, vocabulary):
+    tokens = tokenize(text)
+    words = set(tokens)
+    phrase = f" {' '.join(tokens)} "
+    return [name for name in vocabulary if (name in words if ' ' not in name else f' {name} ' in phrase)]
+
+
+def vocabulary():
+    return set(KNOWN_SKILLS) | set(db.session.scalars(select(Tag.name)))
+
+
+def tag_ids(names):
+    if not names:
+        return []
+    insert_ignore(Tag, [{'name': name} for name in names])
+    return list(db.session.scalars(select(Tag.id).where(Tag.name.in_(names))))
+
+
+def set_job_tags(job_id, names):
+    db.session.execute(delete(job_tags).where(job_tags.c.job_id == job_id))
+    ids = tag_ids(names)
+    if ids:
+        db.session.execute(job_tags.insert(), [{'job_id': job_id, 'tag_id': tag_id} for tag_id in ids])
+
+
+def set_user_tags(user_id, names):
+    db.session.execute(delete(user_tags).where(user_tags.c.user_id == user_id))
+    ids = tag_ids(names)
+    if ids:
+        db.session.execute(user_tags.insert(), [{'user_id': user_id, 'tag_id': tag_id} for tag_id in ids])
+
+
+def tag_jobs(after_id=0, batch_size=1000):
+    """Infer tags for untagged jobs with id > after_id; returns how many got tags."""
+    known = sorted(vocabulary())
+    ids = {}
+    tagged = 0
+    untagged = ~select(job_tags.c.job_id).where(job_tags.c.job_id == Job.id).exists()
+    while True:
+        rows = db.session.execute(
+            select(Job.id, Job.title, Job.description)
+            .where(Job.id > after_id, untagged).order_by(Job.id).limit(batch_size)
+        ).all()
+        if not rows:
+            return tagged
+        links = []
+        for job_id, title, description in rows:
+            names = infer_tags(f'{title} {description}', known)
+            missing = [name for name in names if name not in ids]
+            if missing:
+                tag_ids(missing)
+                ids.update(db.session.execute(select(Tag.name, Tag.id).where(Tag.name.in_(missing))).all())
+            links.extend({'job_id': job_id, 'tag_id': ids[name]} for name in names)
+            tagged += bool(names)
+        if links:
+            db.session.execute(job_tags.insert(), links)
+        db.session.commit()
+        after_id = rows[-1][0]
+
+
+def backfill():
+    """Populate user_tags from User.skills, then tag untagged jobs from their text."""
+    for user_id, skills in db.session.execute(select(User.id, User.skills).where(User.skills.is_not(None))).all():
+        set_user_tags(user_id, parse_tags(skills))
+    db.session.commit()
+    return tag_jobs()
+
+
+def filter_by_tags(query, names, match='all'):
+    matching = (select(job_tags.c.job_id)
+                .join(Tag, Tag.id == job_tags.c.tag_id)
+                .where(Tag.name.in_(names)))
+    if match == 'all':
+        matching = matching.group_by(job_tags.c.job_id).having(func.count() == len(names))
+    return query.filter(Job.id.in_(matching))
@@ -0,0 +1,283 @@
+import json
+import random
+import threading
+import time
+
+import click
+from flask import current_app, has_app_context
+from flask.cli import with_appcontext
+from sqlalchemy import and_, delete, event, or_, select, update
+from sqlalchemy.orm import Session
+
+import applying
+import cache
+import counts
+import events
+import recommend
+import suggest
+import tags
+import versions
+from models import db, Job, Task, User, insert_ignore
+
+# Durable background tasks for side effects a response need not wait for:
+# notification fan-out, tagging and index refreshes after a write.
+#
+# enqueue() inserts a `task` row in the caller's transaction, so a task
+# exists exactly when the write it follows has committed. Workers claim due
+# rows with a single conditional UPDATE that takes a lease; a worker that
+# dies mid-task loses the lease and the task runs again, so handlers must be
+# safe to repeat. Failures are retried with exponential backoff up to the
+# handler's max_attempts, then left as 'failed' with the error. An
+# idempotency key makes queueing the same piece of work twice a no-op; done
+# tasks (and so their keys) are kept for KEEP_DONE_SECONDS.
+#
+# TASK_RUNNER = 'thread' runs a worker thread in each web process, started
+# with the app (so tasks left from before a restart, and retries that come
+# due, run without waiting for a new request) and woken as soon as a request
+# commits new tasks; 'none' leaves them to a separate `flask run-tasks`
+# process. Notifications published from that process only reach /events
+# subscribers through a shared broker (EVENT_BROKER = 'redis'); run-tasks
+# refuses to start without one unless told notifications may be dropped.
+
+BATCH_SIZE = 20
+POLL_SECONDS = 5
+LEASE_SECONDS = 300
+BACKOFF_SECONDS = 2
+MAX_BACKOFF_SECONDS = 600
+KEEP_DONE_SECONDS = 7 * 24 * 3600
+PURGE_EVERY_SECONDS = 3600
+
+_handlers = {}
+_lock = threading.Lock()
+
+
+def task(name, max_attempts=5):
+    """Register a handler; it is called with the payload's keys as arguments."""
+    def register(fn):
+        _handlers[name] = (fn, max_attempts)
+        return fn
+    return register
+
+
+def enqueue(name, payload=None, key=None, delay=0):
+    """Queue `name` in the current transaction; returns False if `key` is already queued."""
+    now = time.time()
+    inserted = insert_ignore(Task, {
+        'name': name,
+        'payload': json.dumps(payload or {}),
+        'idempotency_key': key,
+        'status': 'queued',
+        'attempts': 0,
+        'max_attempts': _handlers[name][1],
+        'run_at': now + delay,
+        'created_at': now,
+    })
+    db.session.info['tasks_enqueued'] = True
+    return bool(inserted)
+
+
+@event.listens_for(Session, 'after_commit')
+def _after_commit(session):
+    if session.info.pop('tasks_enqueued', False) and has_app_context():
+        _wake(current_app._get_current_object())
+
+
+@event.listens_for(Session, 'after_rollback')
+def _after_rollback(session):
+    session.info.pop('tasks_enqueued', None)
+
+
+def backoff(attempts):
+    delay = min(MAX_BACKOFF_SECONDS, BACKOFF_SECONDS * 2 ** (attempts - 1))
+    # Jitter, so tasks that failed together do not all retry together.
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _due(now):
+    return or_(
+        and_(Task.status == 'queued', Task.run_at <= now),
+        and_(Task.status == 'running', Task.locked_until < now, Task.attempts < Task.max_attempts),
+    )
+
+
+def _fail_abandoned(now):
+    # The worker died during the last allowed attempt; don't run it again.
+    db.session.execute(
+        update(Task)
+        .where(Task.status == 'running', Task.locked_until < now, Task.attempts >= Task.max_attempts)
+        .values(status='failed', locked_until=None, last_error='Lease expired on the last attempt')
+    )
+
+
+def _claim(limit):
+    now = time.time()
+    _fail_abandoned(now)
+    candidates = select(Task.id).where(_due(now)).order_by(Task.run_at).limit(limit)
+    # Re-checking _due in the UPDATE makes the claim atomic: of two workers
+    # that picked the same candidates, only one gets each row back.
+    claimed = db.session.execute(
+        update(Task)
+        .where(Task.id.in_(candidates.scalar_subquery()), _due(now))
+        .values(status='running', locked_until=now + LEASE_SECONDS, attempts=Task.attempts + 1)
+        .returning(Task.id, Task.name, Task.payload, Task.attempts, Task.max_attempts)
+    ).all()
+    db.session.commit()
+    return claimed
+
+
+def _run(row):
+    try:
+        handler = _handlers.get(row.name)
+        if handler is None:
+            raise LookupError(f'No handler for task {row.name!r}')
+        handler[0](**json.loads(row.payload))
+        # Done in the same transaction as the handler's own writes.
+        db.session.execute(update(Task).where(Task.id == row.id).values(
+            status='done', locked_until=None, last_error=None))
+        db.session.commit()
+        return True
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.warning('task %s %s failed (attempt %s): %s', row.id, row.name, row.attempts, e)
+        values = {'status': 'queued', 'locked_until': None, 'last_error': f'{type(e).__name__}: {e}'}
+        if row.attempts >= row.max_attempts or row.name not in _handlers:
+            values['status'] = 'failed'
+        else:
+            values['run_at'] = time.time() + backoff(row.attempts)
+        db.session.execute(update(Task).where(Task.id == row.id).values(**values))
+        db.session.commit()
+        return False
+
+
+def work(limit=BATCH_SIZE):
+    """Claim and run up to `limit` due tasks; returns how many were claimed."""
+    claimed = _claim(limit)
+    for row in claimed:
+        _run(row)
+    return len(claimed)
+
+
+def work_all():
+    """Run due tasks until none are left; returns how many were claimed."""
+    total = 0
+    while True:
+        ran = work()
+        if not ran:
+            return total
+        total += ran
+
+
+def purge(keep_seconds=KEEP_DONE_SECONDS):
+    """Delete old done tasks, and expired apply idempotency keys with them."""
+    result = db.session.execute(delete(Task).where(
+        Task.status == 'done', Task.created_at < time.time() - keep_seconds))
+    db.session.commit()
+    applying.purge_keys()
+    return result.rowcount
+
+
+class Runner(threading.Thread):
+    """Works through the queue in the background of one web process."""
+
+    def __init__(self, app, poll=POLL_SECONDS):
+        super().__init__(name='tasks', daemon=True)
+        self.app = app
+        self.poll = poll
+        self._wakeup = threading.Event()
+
+    def wake(self):
+        self._wakeup.set()
+
+    def run(self):
+        purged_at = None
+        while True:
+            with self.app.app_context():
+                try:
+                    if purged_at is None or time.monotonic() - purged_at > PURGE_EVERY_SECONDS:
+                        purge()
+                        purged_at = time.monotonic()
+                    work_all()
+                except Exception:
+                    self.app.logger.exception('task runner failed')
+                finally:
+                    db.session.remove()
+            self._wakeup.wait(self.poll)
+            self._wakeup.clear()
+
+
+def init_app(app):
+    if app.config.get('TASK_RUNNER', 'thread') == 'thread':
+        _runner(app)
+
+
+def _runner(app):
+    runner = app.extensions.get('task_runner')
+    if runner is None:
+        with _lock:
+            runner = app.extensions.get('task_runner')
+            if runner is None:
+                runner = app.extensions['task_runner'] = Runner(app)
+                runner.start()
+    return runner
+
+
+def _wake(app):
+    if app.config.get('TASK_RUNNER', 'thread') == 'thread':
+        _runner(app).wake()
+
+
+@click.command('run-tasks')
+@click.option('--once', is_flag=True, help='Run the tasks that are due now, then exit.')
+@click.option('--poll', type=float, default=POLL_SECONDS, help='Seconds to wait when the queue is empty.')
+@click.option('--drop-notifications', is_flag=True,
+              help='Run even though notifications cannot reach /events subscribers in other processes.')
+@with_appcontext
+def run_tasks_command(once, poll, drop_notifications):
+    """Run queued background tasks until interrupted."""
+    if not events.is_shared() and not drop_notifications:
+        raise click.UsageError('Notifications from this process would be lost: set EVENT_BROKER=redis '
+                               'or pass --drop-notifications.')
+    if once:
+        click.echo(f'Ran {work_all()} tasks.')
+        return
+    purged_at = 0
+    while True:
+        if time.monotonic() - purged_at > PURGE_EVERY_SECONDS:
+            purge()
+            purged_at = time.monotonic()
+        if not work():
+            time.sleep(poll)
+
+
+# Handlers
+
+@task('notify_user')
+def notify_user(user_id, event, data):
+    events.publish_to_user(user_id, event, data)
+
+
+@task('index_job')
+def index_job(job_id, infer_tags=False):
+    row = db.session.execute(
+        select(Job.title, Job.description, Job.location).where(Job.id == job_id)
+    ).first()
+    if row is None:
+        return
+    title, description, location = row
+    if infer_tags:
+        names = tags.infer_tags(f'{title} {description}', tags.vocabulary())
+        if names:
+            tags.set_job_tags(job_id, names)
+            db.session.commit()
+            # Core writes to job_tags bypass the ORM hooks that normally do this.
+            versions.bump('jobs')
+            cache.invalidate('jobs')
+            counts.invalidate_job_counts()
+    recommend.index_job(job_id, title, description)
+    suggest.job_added(job_id, title, location)
+
+
+@task('refresh_user_tags')
+def refresh_user_tags(user_id):
+    skills = db.session.scalar(select(User.skills).where(User.id == user_id))
+    tags.set_user_tags(user_id, tags.parse_tags(skills))
@@ -0,0 +1,133 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import counts  # noqa: E402
+import identity  # noqa: E402
+import query_budget  # noqa: E402
+import recommend  # noqa: E402
+import suggest  # noqa: E402
+import tags  # noqa: E402
+from app import create_app  # noqa: E402
+from config import get_config  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+from models import db, User, Job, Application, Interview  # noqa: E402
+from search import ensure_search_index  # noqa: E402
+
+# Statements each endpoint may run per request. Every request in the suite
+# is checked against these (and for repeated statements) by
+# query_budget.enforce, so a change that adds queries, or turns a join into
+# per-row lazy loads, fails here. Raise a budget deliberately, in the same
+# change that needs it.
+BUDGETS = {
+    'index': 0,
+    'auth.register': 2,
+    'auth.login': 3,
+    'jobs.get_jobs': 3,
+    'jobs.get_jobs_jobseekers': 3,
+    'jobs.suggest_jobs': 1,
+    'jobs.get_job_details': 1,
+    'jobs.create_job': 6,
+    'jobs.bulk_create_jobs': 9,
+    'jobs.get_employer_jobs': 1,
+    'jobs.get_employer_applications': 1,
+    'jobs.export_employer_jobs': 0,
+    'jobs.export_employer_applications': 0,
+    'jobs.update_application_status': 3,
+    'jobs.schedule_interview': 3,
+    'jobs.get_jobseeker_interviews': 1,
+    'jobs.apply_for_job': 4,
+    'applications.apply_for_job': 4,
+    'jobs.apply_job_jobseekers': 4,
+    'jobs.bulk_apply_jobseekers': 4,
+    'applications.get_my_applications': 1,
+    'jobs.get_recommendations': 3,
+    'jobs.get_profile': 1,
+    'jobs.update_profile': 3,
+    'jobs.get_applications': 1,
+    'jobs.remove_application': 2,
+    'jobs.event_stream': 0,
+    'jobs.cache_stats': 0,
+    'jobs.run_batch': 0,
+}
+
+EMPLOYER_ID = 1
+SEEKER_ID = 15
+
+
+def seed():
+    ensure_search_index()
+    for user_id in range(1, 16):
+        role = 'employer' if user_id in (EMPLOYER_ID, 2) else 'job_seeker'
+        user = User(id=user_id, username=f'user{user_id}@test.com', role=role, name=f'User {user_id}')
+        user.set_password('secret')
+        db.session.add(user)
+    db.session.get(User, SEEKER_ID).skills = 'Python, Flask, SQL'
+    jobs = [
+        ('Python Developer', 'Build Flask APIs with SQL', 'Remote', 90000, 'full-time', 1),
+        ('Frontend Engineer', 'React and TypeScript', 'Austin, TX', 85000, 'full-time', 1),
+        ('Data Analyst', 'SQL and Excel reporting', 'Remote', 60000, 'part-time', 1),
+        ('Senior Python Engineer', 'Python, Docker and AWS', 'Seattle, WA', 140000, 'full-time', 1),
+        ('UX Designer', 'Figma prototypes', 'Austin, TX', 70000, 'contract', 2),
+        ('DevOps Engineer', 'Kubernetes, Docker, Terraform', 'Remote', 120000, 'full-time', 2),
+    ]
+    for title, description, location, salary, job_type, employer_id in jobs:
+        db.session.add(Job(title=title, description=description, location=location, salary=salary,
+                           job_type=job_type, employer_id=employer_id))
+    db.session.flush()
+    db.session.add_all([
+        Application(job_id=1, user_id=SEEKER_ID, status='pending'),
+        Application(job_id=2, user_id=SEEKER_ID, status='accepted'),
+        Application(job_id=1, user_id=3, status='pending'),
+    ])
+    db.session.flush()
+    db.session.add(Interview(application_id=2, date='2025-01-10', time='10:00', location='Zoom', notes=''))
+    db.session.commit()
+    tags.backfill()
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv('TEST_DATABASE_URI', f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setenv('JWT_SECRET_KEY', 'test-secret-key-long-enough-for-hs256')
+    app = create_app(get_config('testing'))
+    query_budget.enforce(app, BUDGETS)
+    with app.app_context():
+        db.create_all()
+        seed()
+        # Build the per-process indexes up front so budgets count what a
+        # request costs once a worker is warm, not the one-off load.
+        recommend.get_index()
+        suggest.get_suggester()
+    # Per-process caches outlive an app; start every test from a clean slate.
+    identity._snapshots.clear()
+    counts.invalidate_job_counts()
+    recommend._user_vectors.clear()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def _headers(app, user_id, role):
+    with app.app_context():
+        token = create_access_token(identity=f'user{user_id}@test.com',
+                                    additional_claims={'role': role, 'user_id': user_id})
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def seeker(app):
+    return _headers(app, SEEKER_ID, 'job_seeker')
+
+
+@pytest.fixture
+def employer(app):
+    return _headers(app, EMPLOYER_ID, 'employer')
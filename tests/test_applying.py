@@ -0,0 +1,151 @@
+import threading
+import time
+
+from sqlalchemy import func, select
+
+import applying
+import tasks
+from models import db, Application, ApplicationKey
+
+
+def application_count(app, job_id):
+    with app.app_context():
+        return db.session.scalar(select(func.count()).where(Application.job_id == job_id, Application.user_id == 15))
+
+
+def test_idempotency_key_replays_the_first_answer(app, client, seeker):
+    headers = {**seeker, 'Idempotency-Key': 'click-1'}
+    first = client.post('/jobseekers/jobs/3/apply', headers=headers)
+    retry = client.post('/jobseekers/jobs/3/apply', headers=headers)
+    assert (first.status_code, retry.status_code) == (201, 201)
+    assert 'Idempotent-Replayed' not in first.headers
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert client.post('/jobseekers/jobs/3/apply', headers=seeker).status_code == 400
+    assert application_count(app, 3) == 1
+
+
+def test_replay_keeps_an_already_applied_answer(client):
+    headers = {'Idempotency-Key': 'late'}
+    assert client.post('/applications', headers=headers, json={'job_id': 1}).status_code == 400
+    assert client.post('/applications', headers=headers, json={'job_id': 1}).status_code == 400
+
+
+def test_rejects_bad_input(client, seeker):
+    assert client.post('/applications', headers={'Idempotency-Key': 'x' * 201}, json={'job_id': 3}).status_code == 400
+    assert client.post('/applications', json={}).status_code == 400
+    assert client.post('/jobseekers/jobs/99/apply', headers=seeker).status_code == 404
+
+
+def test_bulk_apply(app, client, seeker):
+    response = client.post('/jobseekers/jobs/apply', headers=seeker, json={'job_ids': [3, 1, 99, 3, 4]})
+    assert response.status_code == 201
+    assert response.get_json() == {'applied': 2, 'results': [
+        {'job_id': 3, 'status': 'applied'},
+        {'job_id': 1, 'status': 'already_applied'},
+        {'job_id': 99, 'status': 'not_found'},
+        {'job_id': 4, 'status': 'applied'},
+    ]}
+    again = client.post('/jobseekers/jobs/apply', headers=seeker, json={'job_ids': [3, 4]})
+    assert (again.status_code, again.get_json()['applied']) == (200, 0)
+
+
+def test_bulk_apply_validates(client, seeker, employer):
+    assert client.post('/jobseekers/jobs/apply', headers=seeker, json={'job_ids': []}).status_code == 400
+    assert client.post('/jobseekers/jobs/apply', headers=seeker, json={'job_ids': ['3']}).status_code == 400
+    too_many = list(range(1, applying.MAX_BULK + 2))
+    assert client.post('/jobseekers/jobs/apply', headers=seeker, json={'job_ids': too_many}).status_code == 400
+    assert client.post('/jobseekers/jobs/apply', headers=employer, json={'job_ids': [3]}).status_code == 403
+
+
+def test_new_application_invalidates_lists(client):
+    before = client.get('/applications/')
+    client.post('/applications', json={'job_id': 5})
+    after = client.get('/applications/', headers={'If-None-Match': before.headers['ETag']})
+    assert after.status_code == 200
+    assert len(after.get_json()) == 3
+
+
+def test_concurrent_double_submits(app):
+    outcomes = []
+    start = threading.Barrier(8)
+
+    def submit(key):
+        start.wait()
+        with app.app_context():
+            submission, = applying.apply(15, [4], key)
+            outcomes.append((key, submission.outcome, submission.replayed))
+
+    threads = [threading.Thread(target=submit, args=('same' if i % 2 else None,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert application_count(app, 4) == 1
+    assert [(outcome, replayed) for _, outcome, replayed in outcomes].count((applying.APPLIED, False)) == 1
+    # Every request with the shared key gets the same answer.
+    assert len({outcome for key, outcome, _ in outcomes if key}) == 1
+
+
+def test_group_commit_coalesces_waiting_submissions(app, monkeypatch):
+    buffer = applying.GroupCommit()
+    writing, release = threading.Event(), threading.Event()
+    write = applying._write
+
+    def slow_write(batch):
+        writing.set()
+        release.wait(5)
+        write(batch)
+
+    monkeypatch.setattr(applying, '_write', slow_write)
+
+    def submit(job_id):
+        with app.app_context():
+            buffer.submit([applying.Submission(job_id, 15)])
+
+    threads = [threading.Thread(target=submit, args=(job_id,)) for job_id in (3, 4, 5, 6)]
+    threads[0].start()
+    writing.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    deadline = time.time() + 5
+    while len(buffer._pending) < 3 and time.time() < deadline:
+        release.wait(0.01)
+    assert len(buffer._pending) == 3
+    release.set()
+    for thread in threads:
+        thread.join()
+    # The first submission is written alone; the three that queued behind it share one transaction.
+    assert (buffer.rows, buffer.batches) == (4, 2)
+    assert application_count(app, 6) == 1
+
+
+def test_a_failing_row_only_fails_its_own_submission(app, monkeypatch):
+    write = applying._write
+
+    def write_unless_job_5(batch):
+        if any(submission.job_id == 5 for submission in batch):
+            raise RuntimeError('job 5 was deleted')
+        write(batch)
+
+    monkeypatch.setattr(applying, '_write', write_unless_job_5)
+    buffer = applying.GroupCommit()
+    other = applying.Submission(5, 15)
+    buffer._pending.append(other)
+    with app.app_context():
+        mine, = buffer.submit([applying.Submission(3, 15)])
+    assert (mine.outcome, mine.error) == (applying.APPLIED, None)
+    assert (other.outcome, str(other.error)) == (None, 'job 5 was deleted')
+    assert buffer.batches == 1
+
+
+def test_expired_keys_are_purged(app):
+    with app.app_context():
+        expired = time.time() - applying.KEY_TTL_SECONDS - 1
+        db.session.add_all([
+            ApplicationKey(user_id=15, job_id=3, key='old', outcome='applied', created_at=expired),
+            ApplicationKey(user_id=15, job_id=3, key='new', outcome='applied', created_at=time.time()),
+        ])
+        db.session.commit()
+        tasks.purge()
+        assert db.session.scalars(select(ApplicationKey.key)).all() == ['new']
@@ -0,0 +1,72 @@
+import passwords
+from models import db, User
+
+
+def test_register(client):
+    response = client.post('/auth/register', json={'email': 'new@test.com', 'password': 'pw', 'full_name': 'New'})
+    assert response.status_code == 201
+    assert response.get_json()['email'] == 'new@test.com'
+
+
+def test_register_rejects_existing_email(client):
+    response = client.post('/auth/register', json={'email': 'user15@test.com', 'password': 'pw'})
+    assert response.status_code == 400
+
+
+def test_register_requires_password(client):
+    assert client.post('/auth/register', json={'email': 'x@test.com'}).status_code == 400
+
+
+def test_login(client):
+    response = client.post('/auth/login', json={'email': 'user15@test.com', 'password': 'secret'})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['user']['id'] == 15
+    assert body['role'] == 'job_seeker'
+    assert body['access_token']
+
+
+def test_login_with_employer_role(client):
+    response = client.post('/auth/api/login', json={'email': 'user1@test.com', 'password': 'secret', 'role': 'employer'})
+    assert response.status_code == 200
+    assert response.get_json()['role'] == 'employer'
+
+
+def test_login_rejects_wrong_password(client):
+    response = client.post('/auth/login', json={'email': 'user15@test.com', 'password': 'nope'})
+    assert response.status_code == 401
+
+
+def test_demo_login_creates_the_account_once(client):
+    for _ in range(2):
+        response = client.post('/auth/login', json={'email': 'demo@test.com', 'password': 'demo123'})
+        assert response.status_code == 200
+    assert response.get_json()['user']['username'] == 'demo@test.com'
+
+
+def test_login_returns_503_when_the_hash_queue_is_full(app, client, monkeypatch):
+    app.config.update(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_QUEUE_DEPTH=1, PASSWORD_HASH_RETRY_AFTER=3)
+    monkeypatch.setattr(passwords, '_pool', None)
+    monkeypatch.setattr(passwords, '_slots', None)
+    with app.app_context():
+        _, slots = passwords._executor()
+    slots.acquire()
+    try:
+        response = client.post('/auth/login', json={'email': 'user15@test.com', 'password': 'secret'})
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '3'
+    finally:
+        slots.release()
+        passwords.shutdown()
+
+
+def test_login_rehashes_a_lower_cost_hash(app, client):
+    app.config['BCRYPT_LOG_ROUNDS'] = 5
+    with app.app_context():
+        assert passwords.hash_cost(db.session.get(User, 15).password_hash) == 4
+    response = client.post('/auth/login', json={'email': 'user15@test.com', 'password': 'secret'})
+    assert response.status_code == 200
+    with app.app_context():
+        password_hash = db.session.get(User, 15).password_hash
+        assert passwords.hash_cost(password_hash) == 5
+        assert passwords.check_password('secret', password_hash)
@@ -0,0 +1,82 @@
+import threading
+
+from sqlalchemy import insert
+
+import cache
+import versions
+from models import db, Job
+
+
+def test_write_from_another_process_retires_the_cached_body(app, client):
+    first = client.get('/jobs')
+    assert first.get_json()['total'] == 6
+    with app.app_context():
+        # What add_jobs.py, ingest-jobs or another worker leave behind: new
+        # rows and a data version bump, but no invalidation in this process.
+        db.session.execute(insert(Job).values(title='T', description='D', location='L', salary=1,
+                                              job_type='full-time', employer_id=1))
+        db.session.commit()
+        versions.bump('jobs')
+    second = client.get('/jobs', headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert second.get_json()['total'] == 7
+
+
+def test_query_args_cannot_collide(client):
+    assert client.get('/jobs?location=Remote%26search%3Dpython').get_json()['total'] == 0
+    assert client.get('/jobs?location=Remote&search=python').get_json()['total'] == 1
+
+
+def test_concurrent_misses_render_once(app):
+    response_cache = cache.ResponseCache(cache.LocalBackend())
+    rendering, release = threading.Event(), threading.Event()
+    renders = []
+    results = []
+
+    def render():
+        renders.append(1)
+        rendering.set()
+        release.wait(5)
+        return b'{}', 'application/json', 200
+
+    def get():
+        results.append(response_cache.get_or_render('k', render))
+
+    threads = [threading.Thread(target=get) for _ in range(4)]
+    threads[0].start()
+    rendering.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    while response_cache.coalesced < 3:
+        release.wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(renders) == 1
+    assert results == [(b'{}', 'application/json', 200)] * 4
+    assert (response_cache.misses, response_cache.coalesced, response_cache.hits) == (1, 3, 3)
+
+
+def test_local_backend_evicts_least_recently_used():
+    backend = cache.LocalBackend(max_bytes=10)
+    backend.set('a', b'1234', 60)
+    backend.set('b', b'1234', 60)
+    assert backend.get('a') == b'1234'
+    backend.set('c', b'1234', 60)
+    assert (backend.get('a'), backend.get('b'), backend.get('c')) == (b'1234', None, b'1234')
+    assert (backend.size, backend.evictions) == (8, 1)
+    backend.set('huge', b'x' * 11, 60)
+    assert backend.get('huge') is None
+
+
+def test_shared_memory_backend(app, client):
+    backend = cache.SharedMemoryBackend()
+    app.extensions['response_cache'] = cache.ResponseCache(backend)
+    assert client.get('/jobs/1').get_json()['id'] == 1
+    assert client.get('/jobs/1').get_json()['id'] == 1
+    assert app.extensions['response_cache'].stats()['hits'] == 1
+    with app.app_context():
+        cache.invalidate('job:1')
+    assert backend.counter('tag:job:1') == 1
+    client.get('/jobs/1')
+    assert app.extensions['response_cache'].stats()['misses'] == 2
@@ -0,0 +1,64 @@
+import json
+
+from query_budget import query_budget
+
+
+def test_employer_jobs(client):
+    jobs = client.get('/employer/jobs').get_json()
+    assert [job['id'] for job in jobs] == [1, 2, 3, 4]
+
+
+def test_employer_jobs_revalidate(client):
+    response = client.get('/employer/jobs')
+    cached = client.get('/employer/jobs', headers={'If-None-Match': response.headers['ETag']})
+    assert cached.status_code == 304
+
+
+def test_employer_applications(client):
+    applications = client.get('/employer/applications').get_json()
+    assert len(applications) == 3
+    assert client.get('/employer/applications?fields=id,status').get_json()[0] == {'id': 3, 'status': 'pending'}
+
+
+def test_export_jobs(client):
+    # Export queries run while the body streams, after the request hooks.
+    with query_budget(1):
+        response = client.get('/employer/jobs/export?fields=id,title')
+        lines = response.get_data(as_text=True).splitlines()
+    assert response.mimetype == 'application/x-ndjson'
+    assert [json.loads(line)['id'] for line in lines] == [1, 2, 3, 4]
+
+
+def test_export_applications_as_csv(client):
+    with query_budget(1):
+        response = client.get('/employer/applications/export?format=csv&fields=id,status')
+        lines = response.get_data(as_text=True).splitlines()
+    assert response.mimetype == 'text/csv'
+    assert lines[0] == 'id,status'
+    assert len(lines) == 4
+
+
+def test_export_rejects_unknown_format(client):
+    assert client.get('/employer/jobs/export?format=xml').status_code == 400
+    assert client.get('/employer/applications/export?format=xml').status_code == 400
+
+
+def test_update_application_status(client):
+    response = client.put('/applications/1/status', json={'status': 'accepted'})
+    assert response.status_code == 200
+    statuses = {app['id']: app['status'] for app in client.get('/employer/applications').get_json()}
+    assert statuses[1] == 'accepted'
+
+
+def test_update_application_status_validates(client):
+    assert client.put('/applications/1/status', json={'status': 'maybe'}).status_code == 400
+    assert client.put('/applications/99/status', json={'status': 'accepted'}).status_code == 404
+
+
+def test_schedule_interview(client, seeker):
+    response = client.post('/interviews', json={
+        'application_id': 1, 'date': '2025-02-01', 'time': '09:30', 'location': 'Office',
+    })
+    assert response.status_code == 201
+    interviews = client.get('/interviews/jobseeker', headers=seeker).get_json()
+    assert len(interviews) == 2
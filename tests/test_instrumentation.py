@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+import instrumentation
+
+
+@pytest.fixture(autouse=True)
+def instrumented(monkeypatch, tmp_path):
+    monkeypatch.setenv('INSTRUMENTATION', '1')
+    monkeypatch.setenv('METRICS_TOKEN', 'scrape-me')
+    monkeypatch.setenv('PROFILE_SAMPLE_RATE', '0')
+    monkeypatch.setenv('PROFILE_DIR', str(tmp_path / 'profiles'))
+
+
+def scrape(client):
+    response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-me'})
+    assert response.status_code == 200
+    return response.get_data(as_text=True)
+
+
+def test_server_timing(client):
+    timing = client.get('/jobs').headers['Server-Timing']
+    assert timing.startswith('app;dur=')
+    assert 'db-slowest;dur=' in timing
+
+
+def test_metrics_need_the_token(client):
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+
+
+def test_metrics_are_cumulative_and_leave_out_sql(client):
+    client.get('/jobs')
+    client.get('/jobs')
+    text = scrape(client)
+    labels = 'method="GET",route="/jobs"'
+    assert '# TYPE workbridge_request_duration_seconds histogram' in text
+    assert f'workbridge_request_duration_seconds_count{{{labels}}} 2' in text
+    assert '# TYPE workbridge_recent_request_duration_seconds gauge' in text
+    assert f'workbridge_recent_request_duration_seconds_count{{{labels}}} 2' in text
+    assert 'SELECT' not in text.upper()
+
+
+def test_rolling_window_forgets_old_requests():
+    histogram = instrumentation.RollingHistogram(window=120, slot=60)
+    histogram.observe(0.02, now=0)
+    histogram.observe(3.0, now=61)
+    assert histogram.snapshot(now=61)[:2] == ([0, 0, 1, 1, 1, 1, 1, 1, 1, 2, 2], 2)
+    assert histogram.snapshot(now=121)[1] == 1
+    assert histogram.snapshot(now=300)[1] == 0
+
+
+def test_slow_requests_are_profiled(app, client):
+    app.config.update(PROFILE_SAMPLE_RATE=1, PROFILE_THRESHOLD_MS=0)
+    client.get('/jobs')
+    names = os.listdir(app.config['PROFILE_DIR'])
+    assert len(names) == 1 and names[0].endswith('.prof') and '-GET-jobs.' in names[0]
+
+
+def test_metrics_are_off_without_a_token(monkeypatch, app):
+    from app import create_app
+    from config import get_config
+    monkeypatch.delenv('METRICS_TOKEN')
+    assert create_app(get_config('testing')).test_client().get('/metrics').status_code == 404
@@ -0,0 +1,323 @@
+import base64
+import json
+import threading
+import time
+
+import pytest
+from sqlalchemy import text
+
+import counts
+import facets
+import recommend
+import search
+import suggest
+from models import db, Job
+from pagination import keyset_page
+
+
+def titles(response):
+    return [job['title'] for job in response.get_json()['jobs']]
+
+
+def test_list_jobs(client):
+    response = client.get('/jobs?per_page=4')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['total'] == 6
+    assert body['pages'] == 2
+    assert body['has_next'] is True
+    assert [job['id'] for job in body['jobs']] == [1, 2, 3, 4]
+
+
+def test_list_aliases(client):
+    for path in ('/api/jobs', '/jobseekers/jobs?page=1&limit=10'):
+        assert client.get(path).get_json()['total'] == 6
+
+
+def test_search_ranks_matches(client):
+    response = client.get('/jobs?search=python')
+    assert set(titles(response)) == {'Python Developer', 'Senior Python Engineer'}
+
+
+def test_search_matches_prefixes_and_every_word(client):
+    assert set(titles(client.get('/jobs?search=pyth'))) == {'Python Developer', 'Senior Python Engineer'}
+    assert titles(client.get('/jobs?search=python dock')) == ['Senior Python Engineer']
+    assert titles(client.get('/jobs?search=Docker, Kubernetes')) == ['DevOps Engineer']
+    assert client.get('/jobs?search=python cobol').get_json()['total'] == 0
+
+
+def test_search_setup_can_run_twice(app):
+    # Two workers can both find the index missing and both run the setup.
+    with app.app_context(), db.engine.begin() as conn:
+        for statement in search._SQLITE_SETUP:
+            conn.execute(text(statement))
+    with app.app_context():
+        search._ready.discard(str(db.engine.url))
+        search.ensure_search_index()
+
+
+def test_filters(client):
+    assert client.get('/jobs?location=austin').get_json()['total'] == 2
+    assert client.get('/jobs?job_type=contract').get_json()['total'] == 1
+    assert titles(client.get('/jobs?min_salary=100000&max_salary=130000')) == ['DevOps Engineer']
+
+
+def test_tag_filter(client):
+    assert set(titles(client.get('/jobs?tags=docker,python&match=all'))) == {'Senior Python Engineer'}
+    assert client.get('/jobs?tags=docker,python&match=any').get_json()['total'] == 3
+    assert client.get('/jobs?match=some').status_code == 400
+
+
+def test_sorting(client):
+    salaries = [job['salary'] for job in client.get('/jobs?sort=-salary').get_json()['jobs']]
+    assert salaries == sorted(salaries, reverse=True)
+    ids = [job['id'] for job in client.get('/jobs?sort=newest').get_json()['jobs']]
+    assert ids == sorted(ids, reverse=True)
+    assert client.get('/jobs?sort=random').status_code == 400
+
+
+def test_facets(client):
+    facets = client.get('/jobs?facets=1&salary_bucket=50000').get_json()['facets']
+    assert {'value': 'Remote', 'count': 3} in facets['location']
+    assert {'value': 'full-time', 'count': 4} in facets['job_type']
+    assert {'value': 'docker', 'count': 2} in facets['tags']
+    assert facets['salary'][0] == {'min': 50000, 'max': 100000, 'count': 4}
+    assert client.get('/jobs?facets=color').status_code == 400
+
+
+def test_salary_histogram_is_capped(client, monkeypatch):
+    assert client.get('/jobs?facets=salary&salary_bucket=1').status_code == 400
+    assert client.get('/jobs?facets=salary&salary_bucket=100000000000000000000000').status_code == 400
+    assert client.get(f'/jobs?facets=salary&salary_bucket={facets.MAX_SALARY_BUCKET}').status_code == 200
+    monkeypatch.setattr(facets, 'MAX_SALARY_BUCKETS', 3)
+    salary = client.get('/jobs?facets=salary&salary_bucket=10000').get_json()['facets']['salary']
+    # 60k..140k would be nine 10k buckets; merged into 30k ones instead.
+    assert salary == [
+        {'min': 60000, 'max': 90000, 'count': 3},
+        {'min': 90000, 'max': 120000, 'count': 1},
+        {'min': 120000, 'max': 150000, 'count': 2},
+    ]
+
+
+def test_cursor_pagination(client):
+    first = client.get('/jobs?cursor=&limit=4').get_json()
+    second = client.get(f"/jobs?cursor={first['next_cursor']}&limit=4").get_json()
+    assert [job['id'] for job in first['jobs'] + second['jobs']] == [1, 2, 3, 4, 5, 6]
+    assert second['has_next'] is False
+    assert client.get('/jobs?cursor=not-a-cursor').status_code == 400
+
+
+def test_sparse_fields(client):
+    job = client.get('/jobs?fields=id,title').get_json()['jobs'][0]
+    assert job == {'id': 1, 'title': 'Python Developer'}
+    assert client.get('/jobs?fields=password').status_code == 400
+    for empty in (',', ' , ', ''):
+        jobs = client.get(f'/jobs?fields={empty}').get_json()['jobs']
+        assert jobs[0]['title'] == 'Python Developer' and 'salary' in jobs[0]
+    assert client.get('/jobs/1?fields=,').get_json()['id'] == 1
+
+
+def test_etag_revalidation(client):
+    response = client.get('/jobs')
+    cached = client.get('/jobs', headers={'If-None-Match': response.headers['ETag']})
+    assert cached.status_code == 304
+
+
+def test_job_details(client):
+    response = client.get('/jobs/4')
+    assert response.status_code == 200
+    assert response.get_json()['title'] == 'Senior Python Engineer'
+    assert client.get('/jobs/999').status_code == 404
+
+
+def test_suggest(client):
+    response = client.get('/jobs/suggest?q=eng')
+    values = [item['value'] for item in response.get_json()['suggestions']]
+    assert values == ['DevOps Engineer', 'Frontend Engineer', 'Senior Python Engineer']
+    locations = client.get('/jobs/suggest?field=location&q=re').get_json()['suggestions']
+    assert locations == [{'value': 'Remote', 'count': 3}]
+    assert client.get('/jobs/suggest?field=salary').status_code == 400
+
+
+def test_create_job(client, employer):
+    response = client.post('/jobs', headers=employer, json={
+        'title': 'Go Developer', 'description': 'Go and Docker services', 'location': 'Remote',
+        'salary': 110000, 'tags': ['go', 'docker'],
+    })
+    assert response.status_code == 201
+    job_id = response.get_json()['job_id']
+    assert client.get(f'/jobs/{job_id}').get_json()['title'] == 'Go Developer'
+    assert client.get('/jobs?tags=go').get_json()['total'] == 1
+    assert client.get('/jobs/suggest?q=go').get_json()['suggestions'][0]['value'] == 'Go Developer'
+
+
+def test_create_job_invalidates_cached_list(client, employer):
+    assert client.get('/jobs').get_json()['total'] == 6
+    client.post('/jobs', headers=employer, json={'title': 'T', 'description': 'D', 'location': 'L', 'salary': 1})
+    assert client.get('/jobs').get_json()['total'] == 7
+
+
+def test_create_job_requires_login(client):
+    assert client.post('/jobs', json={'title': 'T'}).status_code == 401
+
+
+def test_bulk_create_jobs(client, employer):
+    lines = [
+        {'title': 'Rust Engineer', 'description': 'Rust and Kubernetes', 'location': 'Remote', 'salary': 1},
+        {'title': 'Missing description', 'location': 'Remote'},
+    ]
+    response = client.post('/jobs/bulk', headers={**employer, 'Content-Type': 'application/x-ndjson'},
+                           data='\n'.join(json.dumps(line) for line in lines))
+    assert response.status_code == 201
+    report = response.get_json()
+    assert report['inserted'] == 1
+    assert report['errors'] == [{'line': 2, 'error': 'description is required'}]
+    assert client.get('/jobs?tags=rust').get_json()['total'] == 1
+
+
+def test_bulk_create_jobs_rejects_bad_salaries_and_encoding(client, employer):
+    job = {'title': 'T', 'description': 'D', 'location': 'L'}
+    body = b'\n'.join([
+        json.dumps({**job, 'salary': 'nan'}).encode(),
+        b'{"title": "Caf\xe9", "description": "D", "location": "L"}',
+    ])
+    response = client.post('/jobs/bulk', headers={**employer, 'Content-Type': 'application/x-ndjson'}, data=body)
+    assert response.status_code == 400
+    assert response.get_json()['errors'] == [
+        {'line': 1, 'error': 'salary must be a finite number'},
+        {'line': 2, 'error': 'title is not valid UTF-8'},
+    ]
+    csv_body = b'title,description,location,salary\nT,D,L,inf\nT,D\xff,L,1\n'
+    response = client.post('/jobs/bulk', headers={**employer, 'Content-Type': 'text/csv'}, data=csv_body)
+    assert response.status_code == 400
+    assert [error['line'] for error in response.get_json()['errors']] == [2, 3]
+
+
+def test_bulk_create_jobs_is_for_employers(client, seeker):
+    assert client.post('/jobs/bulk', headers=seeker, data='').status_code == 403
+
+
+def test_recommendations(client, seeker):
+    response = client.get('/jobseekers/recommendations', headers=seeker)
+    assert response.status_code == 200
+    jobs = response.get_json()['jobs']
+    # Jobs 1 and 2 are already applied to.
+    assert jobs[0]['title'] == 'Senior Python Engineer'
+    assert all(job['id'] not in (1, 2) for job in jobs)
+    assert jobs == sorted(jobs, key=lambda job: -job['score'])
+
+
+def test_recommendation_limit_is_clamped(client, seeker):
+    for limit, expected in (('-2', 1), ('-100', 1), ('1', 1), ('2', 2)):
+        response = client.get(f'/jobseekers/recommendations?limit={limit}', headers=seeker)
+        assert response.status_code == 200
+        assert len(response.get_json()['jobs']) == expected
+
+
+def test_recommendations_are_for_job_seekers(client, employer):
+    assert client.get('/jobseekers/recommendations', headers=employer).status_code == 403
+
+
+def wait_for(condition):
+    deadline = time.time() + 5
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.mark.parametrize('index, get', [
+    (recommend._index, recommend.get_index),
+    (suggest._suggester, suggest.get_suggester),
+])
+def test_stale_index_is_rebuilt_in_the_background(app, monkeypatch, index, get):
+    release = threading.Event()
+    build = index.build
+
+    def slow_build(*args):
+        release.wait(5)
+        return build(*args)
+
+    monkeypatch.setattr(index, 'build', slow_build)
+    with app.app_context():
+        old = get()
+        old.built_at -= index.rebuild_seconds + 1
+        # Served from the old index while the new one is built.
+        assert get() is old
+        assert get() is old
+    release.set()
+    assert wait_for(lambda: index.current is not old)
+    assert wait_for(lambda: not index.rebuilding)
+    assert index.current.url == old.url
+
+
+def encoded(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip('=')
+
+
+def test_keyset_page_rejects_empty_pages(app):
+    with app.app_context():
+        for limit in (0, -2):
+            with pytest.raises(ValueError):
+                keyset_page(Job.query, [(Job.id, False)], None, limit)
+
+
+def test_cursor_rejects_malformed_values(client):
+    first = client.get('/jobs?cursor=&limit=2').get_json()['next_cursor']
+    sort, _ = json.loads(base64.urlsafe_b64decode(first + '=' * (-len(first) % 4)))
+    for values in ([[1]], [None], ['x'], [1.5], [True], [1, 2], 'x'):
+        assert client.get(f'/jobs?cursor={encoded([sort, values])}').status_code == 400, values
+    assert client.get(f'/jobs?cursor={encoded([1])}').status_code == 400
+
+
+def test_cursor_is_tied_to_its_sort(client):
+    cursor = client.get('/jobs?cursor=&limit=2&sort=salary').get_json()['next_cursor']
+    assert client.get(f'/jobs?cursor={cursor}&limit=2&sort=salary').status_code == 200
+    assert client.get(f'/jobs?cursor={cursor}&limit=2&sort=-salary').status_code == 400
+
+
+def test_page_size_is_clamped(client):
+    for query, per_page in (('per_page=0', 1), ('limit=-1', 1), ('per_page=-3', 1), ('per_page=500', 50)):
+        body = client.get(f'/jobs?{query}').get_json()
+        assert body['per_page'] == per_page, query
+        assert len(body['jobs']) == min(per_page, 6)
+        assert body['pages'] == -(-6 // per_page)
+    assert client.get('/jobs?cursor=&limit=0').get_json()['limit'] == 1
+
+
+def test_page_and_limit_must_be_numbers(client):
+    for query in ('limit=abc', 'per_page=1.5', 'page=x', 'cursor=&limit=abc'):
+        assert client.get(f'/jobs?{query}').status_code == 400, query
+
+
+def test_page_beyond_the_limit_is_rejected(client):
+    assert client.get('/jobs?page=99999999999999999999').status_code == 400
+    assert client.get('/jobs?page=10000').status_code == 200
+
+
+def test_count_modes(client):
+    assert 'total' not in client.get('/jobs?cursor=').get_json()
+    body = client.get('/jobs?cursor=&count=estimate').get_json()
+    assert (body['total'], body['total_estimated']) == (6, False)
+    assert client.get('/jobs?count=none&page=1').get_json()['total'] is None
+    assert client.get('/jobs?count=bogus').status_code == 400
+
+
+def test_counts_are_invalidated_on_commit_not_flush(app, client):
+    assert client.get('/jobs').get_json()['total'] == 6
+    with app.app_context():
+        db.session.add(Job(title='T', description='D', location='Nowhere', salary=1, job_type='full-time',
+                           employer_id=1))
+        db.session.flush()
+        # A request from another thread between flush and commit caches the old total again.
+        totals = []
+
+        def count():
+            totals.append(client.get('/jobs?location=Nowhere').get_json()['total'])
+
+        thread = threading.Thread(target=count)
+        thread.start()
+        thread.join(5)
+        assert totals == [0]
+        assert len(counts._job_counts) == 2
+        db.session.commit()
+        assert len(counts._job_counts) == 0
@@ -0,0 +1,126 @@
+import threading
+
+from flask import request
+
+import batch
+import events
+from conftest import BUDGETS
+
+
+def test_index(client):
+    assert client.get('/').status_code == 200
+
+
+def test_event_stream(client, seeker):
+    response = client.get('/events', headers=seeker)
+    assert response.mimetype == 'text/event-stream'
+    frames = iter(response.response)
+    next(frames)
+    events.publish_to_user(15, 'application', {'id': 1, 'status': 'accepted'})
+    frame = next(frames)
+    frame = frame.decode() if isinstance(frame, bytes) else frame
+    assert 'event: application' in frame
+    response.close()
+
+
+def test_cache_stats(client):
+    assert client.get('/cache/stats').status_code == 200
+
+
+def test_batch(client, seeker):
+    response = client.post('/batch', headers=seeker, json={'requests': {
+        'jobs': '/jobs?per_page=2', 'profile': '/profile',
+    }})
+    responses = response.get_json()['responses']
+    assert responses['jobs']['body']['total'] == 6
+    assert responses['profile']['body']['id'] == 15
+    assert client.post('/batch', json={'requests': {'e': '/events'}}).status_code == 400
+
+
+def test_every_endpoint_has_a_budget(app):
+    endpoints = {rule.endpoint for rule in app.url_map.iter_rules() if rule.endpoint != 'static'}
+    assert endpoints <= set(BUDGETS)
+
+
+def test_batch_rejects_encoded_paths_to_excluded_endpoints(client, seeker):
+    for path in ('/%65vents', '/%62atch', '/%65vents?jwt=x'):
+        response = client.post('/batch', headers=seeker, json={'requests': {'a': path}})
+        assert response.status_code == 400, path
+
+
+def test_batch_times_out_slow_sub_requests(app, client, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(batch, 'TIMEOUT_SECONDS', 0.2)
+    monkeypatch.setattr(batch, '_dispatch', lambda *args: release.wait(5))
+    try:
+        responses = client.post('/batch', json={'requests': {'slow': '/jobs'}}).get_json()['responses']
+    finally:
+        release.set()
+    assert responses['slow']['status'] == 504
+
+
+def test_only_events_accepts_a_token_in_the_query_string(client, seeker):
+    token = seeker['Authorization'].split()[1]
+    response = client.get(f'/events?jwt={token}')
+    assert response.status_code == 200
+    response.close()
+    assert client.get(f'/profile?jwt={token}').status_code == 401
+
+
+def test_events_app_serves_only_events(app, seeker):
+    from app import create_events_app
+    from config import get_config
+    client = create_events_app(get_config('testing')).test_client()
+    token = seeker['Authorization'].split()[1]
+    response = client.get(f'/events?jwt={token}')
+    assert (response.status_code, response.mimetype) == (200, 'text/event-stream')
+    response.close()
+    assert client.get('/events').status_code == 401
+    assert client.get('/jobs').status_code == 404
+
+
+def test_api_can_hand_events_to_the_events_app(app, client, seeker):
+    app.config['SERVE_EVENTS'] = False
+    assert client.get('/events', headers=seeker).status_code == 404
+
+
+def test_concurrent_batches_do_not_queue(app, client, monkeypatch):
+    # Two full batches at once must all be running together, not waiting for pool threads.
+    started = threading.Barrier(2 * batch.MAX_REQUESTS + 1)
+
+    def dispatch(*args):
+        started.wait(5)
+        return {'status': 200, 'body': None}
+
+    monkeypatch.setattr(batch, '_dispatch', dispatch)
+    items = [(str(i), '/jobs') for i in range(batch.MAX_REQUESTS)]
+    results = []
+
+    def post():
+        with app.test_request_context('/batch', method='POST'):
+            results.append(batch.run(items))
+
+    threads = [threading.Thread(target=post) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    started.wait(5)
+    for thread in threads:
+        thread.join(5)
+    assert [response['status'] for result in results for response in result.values()] == [200] * 20
+
+
+def test_preflight_is_answered_before_flask(app, client):
+    seen = []
+    app.before_request(lambda: seen.append(request.path))
+    preflight = {'Access-Control-Request-Method': 'POST', 'Access-Control-Request-Headers': 'Authorization'}
+    response = client.options('/jobs', headers={**preflight, 'Origin': 'http://localhost:5173'})
+    assert response.status_code == 204
+    assert response.headers['Access-Control-Allow-Origin'] == 'http://localhost:5173'
+    assert response.headers['Access-Control-Max-Age'] == str(app.config['CORS_MAX_AGE'])
+    assert response.headers['Access-Control-Allow-Credentials'] == 'true'
+    assert seen == []
+
+    response = client.options('/jobs', headers={**preflight, 'Origin': 'http://evil.example'})
+    assert response.status_code != 204
+    assert 'Access-Control-Allow-Origin' not in response.headers
+    assert seen == ['/jobs']
@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import select
+
+from models import db, Job, Application
+from query_budget import QueryBudgetExceeded, query_budget
+
+
+def test_counts_statements(app):
+    with app.app_context():
+        with query_budget(2) as recorder:
+            db.session.execute(select(Job.id)).all()
+            db.session.execute(select(Application.id)).all()
+    assert len(recorder) == 2
+
+
+def test_fails_over_budget(app):
+    with app.app_context():
+        with pytest.raises(QueryBudgetExceeded, match='2 queries, budget is 1'):
+            with query_budget(1):
+                db.session.execute(select(Job.id)).all()
+                db.session.execute(select(Application.id)).all()
+
+
+def test_flags_identical_statements(app):
+    with app.app_context():
+        with pytest.raises(QueryBudgetExceeded, match='same parameters'):
+            with query_budget():
+                for _ in range(2):
+                    db.session.execute(select(Job.title).where(Job.id == 1)).all()
+
+
+def test_flags_n_plus_one(app):
+    with app.app_context():
+        job_ids = [job_id for job_id, in db.session.execute(select(Job.id))]
+        with pytest.raises(QueryBudgetExceeded, match='possible N\\+1'):
+            with query_budget():
+                for job_id in job_ids:
+                    db.session.execute(select(Application.id).where(Application.job_id == job_id)).all()
+
+
+def test_allows_duplicates_when_asked(app):
+    with app.app_context():
+        with query_budget(allow_duplicates=True) as recorder:
+            for _ in range(2):
+                db.session.execute(select(Job.title).where(Job.id == 1)).all()
+    assert len(recorder.duplicates()) == 1
+
+
+def test_works_as_decorator(app):
+    @query_budget(1)
+    def two_queries():
+        db.session.execute(select(Job.id)).all()
+        db.session.execute(select(Application.id)).all()
+
+    with app.app_context(), pytest.raises(QueryBudgetExceeded):
+        two_queries()
+
+
+def test_enforce_checks_each_request(app, client, employer, monkeypatch):
+    monkeypatch.setitem(app.extensions['query_budgets'], 'jobs.get_employer_jobs', 0)
+    with pytest.raises(QueryBudgetExceeded, match='GET /employer/jobs'):
+        client.get('/employer/jobs', headers=employer)
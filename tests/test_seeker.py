@@ -0,0 +1,57 @@
+def applied_job_ids(client):
+    return sorted(app['job_id'] for app in client.get('/applications/').get_json())
+
+
+def test_apply_for_job(client):
+    assert client.post('/applications', json={'job_id': 3}).status_code == 201
+    assert client.post('/applications', json={'job_id': 3}).status_code == 400
+    assert applied_job_ids(client) == [1, 2, 3]
+
+
+def test_apply_through_applications_blueprint(client):
+    assert client.post('/api/', json={'job_id': 4}).status_code == 201
+    assert applied_job_ids(client) == [1, 2, 4]
+
+
+def test_apply_as_job_seeker(client, seeker, employer):
+    assert client.post('/jobseekers/jobs/5/apply', headers=seeker).status_code == 201
+    assert client.post('/jobseekers/jobs/5/apply', headers=seeker).status_code == 400
+    assert client.post('/jobseekers/jobs/6/apply', headers=employer).status_code == 403
+
+
+def test_my_applications(client, seeker, employer):
+    applications = client.get('/api/applications/my-applications', headers=seeker).get_json()
+    assert sorted(app['job']['id'] for app in applications) == [1, 2]
+    response = client.get('/api/applications/my-applications', headers=employer)
+    assert response.status_code == 403
+
+
+def test_remove_application(client):
+    assert client.delete('/applications/2').status_code == 200
+    assert client.delete('/applications/2').status_code == 404
+    assert applied_job_ids(client) == [1]
+
+
+def test_interviews(client, seeker):
+    interviews = client.get('/interviews/jobseeker', headers=seeker).get_json()
+    assert len(interviews) == 1
+    assert interviews[0]['location'] == 'Zoom'
+
+
+def test_profile(client, seeker):
+    profile = client.get('/profile', headers=seeker).get_json()
+    assert profile['id'] == 15
+    assert profile['skills'] == 'Python, Flask, SQL'
+
+
+def test_update_profile(client, seeker):
+    response = client.put('/jobseekers/me', headers=seeker, json={'name': 'Sam', 'skills': 'Figma'})
+    assert response.status_code == 200
+    profile = client.get('/jobseekers/me', headers=seeker).get_json()
+    assert (profile['name'], profile['skills']) == ('Sam', 'Figma')
+    recommended = client.get('/jobseekers/recommendations', headers=seeker).get_json()['jobs']
+    assert recommended[0]['title'] == 'UX Designer'
+
+
+def test_profile_requires_login(client):
+    assert client.get('/profile').status_code == 401
@@ -0,0 +1,181 @@
+import time
+
+import pytest
+from sqlalchemy import select
+
+import events
+import tasks
+from models import db, Task, Tag, job_tags, user_tags
+
+calls = []
+
+
+@tasks.task('test_record', max_attempts=3)
+def record(value):
+    calls.append(value)
+
+
+@tasks.task('test_fail', max_attempts=2)
+def fail():
+    raise RuntimeError('boom')
+
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    calls.clear()
+
+
+def statuses():
+    return db.session.execute(select(Task.name, Task.status, Task.attempts).order_by(Task.id)).all()
+
+
+def test_runs_committed_tasks(app):
+    with app.app_context():
+        tasks.enqueue('test_record', {'value': 1})
+        db.session.commit()
+        assert tasks.work_all() == 1
+        assert calls == [1]
+        assert statuses() == [('test_record', 'done', 1)]
+
+
+def test_rolled_back_tasks_never_run(app):
+    with app.app_context():
+        tasks.enqueue('test_record', {'value': 1})
+        db.session.rollback()
+        assert tasks.work_all() == 0
+        assert calls == []
+
+
+def test_idempotency_key(app):
+    with app.app_context():
+        assert tasks.enqueue('test_record', {'value': 1}, key='once') is True
+        assert tasks.enqueue('test_record', {'value': 2}, key='once') is False
+        db.session.commit()
+        tasks.work_all()
+        assert calls == [1]
+
+
+def test_delayed_tasks_wait(app):
+    with app.app_context():
+        tasks.enqueue('test_record', {'value': 1}, delay=60)
+        db.session.commit()
+        assert tasks.work_all() == 0
+
+
+def test_retries_then_fails(app, monkeypatch):
+    monkeypatch.setattr(tasks, 'BACKOFF_SECONDS', 0)
+    with app.app_context():
+        tasks.enqueue('test_fail')
+        db.session.commit()
+        assert tasks.work_all() == 2
+        assert statuses() == [('test_fail', 'failed', 2)]
+        assert db.session.scalar(select(Task.last_error)) == 'RuntimeError: boom'
+
+
+def test_backoff_grows():
+    assert tasks.backoff(1) <= 2 <= tasks.backoff(3) <= 8
+    assert tasks.backoff(50) <= tasks.MAX_BACKOFF_SECONDS
+
+
+def test_unknown_task_fails_without_retry(app):
+    with app.app_context():
+        tasks.enqueue('test_record', {'value': 1})
+        db.session.execute(Task.__table__.update().values(name='gone'))
+        db.session.commit()
+        tasks.work_all()
+        assert statuses() == [('gone', 'failed', 1)]
+
+
+def test_expired_lease_is_reclaimed(app):
+    with app.app_context():
+        tasks.enqueue('test_record', {'value': 1})
+        db.session.execute(Task.__table__.update().values(status='running', locked_until=time.time() - 1))
+        db.session.commit()
+        assert tasks.work_all() == 1
+        assert calls == [1]
+
+
+def test_status_update_notifies_after_commit(app, client):
+    broker = events.get_broker()
+    subscription = broker.subscribe(events.user_channel(15))
+    try:
+        client.put('/applications/2/status', json={'status': 'rejected'})
+        assert subscription.empty()
+        with app.app_context():
+            tasks.work_all()
+        _, event, data = subscription.get_nowait()
+        assert (event, data['status']) == ('application', 'rejected')
+    finally:
+        broker.unsubscribe(events.user_channel(15), subscription)
+
+
+def test_create_job_infers_tags_in_the_background(app, client, employer):
+    job_id = client.post('/jobs', headers=employer, json={
+        'title': 'Platform Engineer', 'description': 'Terraform and Kubernetes', 'location': 'Remote', 'salary': 1,
+    }).get_json()['job_id']
+    assert job_id not in [job['id'] for job in client.get('/jobs?tags=terraform').get_json()['jobs']]
+    with app.app_context():
+        tasks.work_all()
+    assert job_id in [job['id'] for job in client.get('/jobs?tags=terraform').get_json()['jobs']]
+
+
+def test_profile_update_refreshes_user_tags(app, client, seeker):
+    client.put('/profile', headers=seeker, json={'skills': 'Rust, Go'})
+    with app.app_context():
+        tasks.work_all()
+        names = db.session.scalars(
+            select(Tag.name).join(user_tags, user_tags.c.tag_id == Tag.id).where(user_tags.c.user_id == 15)
+        ).all()
+    assert sorted(names) == ['go', 'rust']
+
+
+def test_thread_runner_picks_up_new_tasks(app, client, employer):
+    app.config['TASK_RUNNER'] = 'thread'
+    job_id = client.post('/jobs', headers=employer, json={
+        'title': 'Kotlin Developer', 'description': 'Android apps in Kotlin', 'location': 'Remote', 'salary': 1,
+    }).get_json()['job_id']
+    deadline = time.time() + 5
+    with app.app_context():
+        while time.time() < deadline:
+            db.session.rollback()
+            if db.session.scalar(select(Task.status)) == 'done':
+                break
+            time.sleep(0.05)
+        assert db.session.scalar(select(job_tags.c.job_id).where(job_tags.c.job_id == job_id)) == job_id
+
+
+def test_expired_lease_on_the_last_attempt_fails(app):
+    with app.app_context():
+        tasks.enqueue('test_record', {'value': 1})
+        db.session.execute(Task.__table__.update().values(status='running', attempts=3,
+                                                          locked_until=time.time() - 1))
+        db.session.commit()
+        assert tasks.work_all() == 0
+        assert calls == []
+        assert statuses() == [('test_record', 'failed', 3)]
+
+
+def test_runner_starts_with_the_app_and_purges(app):
+    with app.app_context():
+        tasks.enqueue('test_record', {'value': 1})
+        db.session.add(Task(name='test_record', payload='{}', status='done', attempts=1, max_attempts=3,
+                            run_at=0, created_at=0))
+        db.session.commit()
+    app.config['TASK_RUNNER'] = 'thread'
+    tasks.init_app(app)
+    deadline = time.time() + 5
+    with app.app_context():
+        while statuses() != [('test_record', 'done', 1)] and time.time() < deadline:
+            db.session.rollback()
+            time.sleep(0.05)
+        # The old done task was purged; the one queued before the runner started has run.
+        assert statuses() == [('test_record', 'done', 1)]
+    assert calls == [1]
+
+
+def test_run_tasks_needs_a_shared_broker(app):
+    result = app.test_cli_runner().invoke(args=['run-tasks', '--once'])
+    assert result.exit_code != 0
+    assert 'EVENT_BROKER=redis' in result.output
+    result = app.test_cli_runner().invoke(args=['run-tasks', '--once', '--drop-notifications'])
+    assert result.exit_code == 0
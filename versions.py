@@ -0,0 +1,139 @@
+import hashlib
+import mmap
+import os
+import secrets
+import struct
+import threading
+from functools import wraps
+
+from flask import current_app, make_response, request
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Per-resource data versions, bumped after every committed write. List
+# endpoints derive their ETag from the versions they depend on, so a poll
+# whose data has not changed is answered with 304 before any query runs.
+#
+# The file store keeps the counters in a small mmap'd file under instance/,
+# shared by every worker process on the host; reading one is a memory load.
+# The memory store is for tests and single-process tools.
+
+RESOURCES = ('jobs', 'applications', 'interviews', 'users')
+_SLOT = struct.Struct('<Q')
+
+
+class MemoryVersions:
+    def __init__(self):
+        self.epoch = secrets.randbits(63)
+        self._counters = dict.fromkeys(RESOURCES, 0)
+        self._lock = threading.Lock()
+
+    def get(self, resource):
+        return self._counters[resource]
+
+    def bump(self, resource):
+        with self._lock:
+            self._counters[resource] += 1
+
+
+class FileVersions:
+    def __init__(self, path):
+        size = _SLOT.size * (len(RESOURCES) + 1)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        with self._locked():
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+            self._map = mmap.mmap(self._fd, size)
+            if not self._read(0):
+                _SLOT.pack_into(self._map, 0, secrets.randbits(63))
+
+    @property
+    def epoch(self):
+        return self._read(0)
+
+    def _read(self, slot):
+        return _SLOT.unpack_from(self._map, slot * _SLOT.size)[0]
+
+    def _locked(self):
+        return _FileLock(self._fd)
+
+    def get(self, resource):
+        return self._read(RESOURCES.index(resource) + 1)
+
+    def bump(self, resource):
+        slot = RESOURCES.index(resource) + 1
+        with self._locked():
+            _SLOT.pack_into(self._map, slot * _SLOT.size, self._read(slot) + 1)
+
+
+class _FileLock:
+    def __init__(self, fd):
+        self.fd = fd
+
+    def __enter__(self):
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+
+_default = MemoryVersions()
+
+
+def init_app(app):
+    if app.config.get('DATA_VERSIONS', 'file') == 'file':
+        os.makedirs(app.instance_path, exist_ok=True)
+        store = FileVersions(os.path.join(app.instance_path, 'data_versions.bin'))
+    else:
+        store = MemoryVersions()
+    app.extensions['versions'] = store
+
+
+def _store():
+    return current_app.extensions.get('versions', _default)
+
+
+def get(resource):
+    return _store().get(resource)
+
+
+def epoch():
+    return _store().epoch
+
+
+def bump(*resources):
+    store = _store()
+    for resource in resources:
+        store.bump(resource)
+
+
+def etag(resources):
+    store = _store()
+    parts = [str(store.epoch)] + [str(store.get(resource)) for resource in resources]
+    # The response also depends on the URL and on who is asking.
+    parts += [request.full_path, request.headers.get('Authorization', '')]
+    return hashlib.blake2b('|'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def conditional(*resources):
+    """Serve 304 for unchanged data and tag fresh 200 responses with an ETag."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            tag = etag(resources)
+            if request.if_none_match.contains(tag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(tag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator